@@ -0,0 +1,104 @@
+"""Compare per-pair and batched phrase scoring for many concurrent calls.
+
+Run from the repository root:
+
+    python -m benchmarks.batch_scoring
+"""
+
+import argparse
+import random
+import time
+
+import jellyfish
+
+from benchmarks.synthetic import misspell, phrase_events, vocabulary
+from custom_components.twilio_call_live.config import EventPhrasesList
+from custom_components.twilio_call_live.phrase_index import PhraseIndex
+from custom_components.twilio_call_live.transcription_utils import (
+    PhraseMatcher,
+    match_events_batch,
+)
+
+CALL_COUNTS = (10, 100, 1000)
+THRESHOLD = 0.8
+
+
+def _transcripts(
+    rng: random.Random, words: list[str], phrases: list[str], calls: int
+) -> list[str]:
+    transcripts = []
+    for _ in range(calls):
+        transcript = rng.choices(words, k=20)
+        if rng.random() < 0.5:
+            transcript.insert(
+                rng.randrange(len(transcript)), misspell(rng, rng.choice(phrases))
+            )
+        transcripts.append(" ".join(transcript))
+    return transcripts
+
+
+def _pairwise(index: PhraseIndex, transcripts: list[str]) -> int:
+    """Score every window of every call against every literal with jellyfish."""
+    matches = 0
+    for transcript in transcripts:
+        tokens = transcript.split()
+        for literal in index.literals:
+            for offset in range(len(tokens) - literal.size + 1):
+                window = " ".join(tokens[offset : offset + literal.size])
+                if jellyfish.jaro_winkler_similarity(window, literal.text) > THRESHOLD:
+                    matches += 1
+                    break
+    return matches
+
+
+def _indexed(index: PhraseIndex, transcripts: list[str]) -> int:
+    """Match each call on its own through the trigram index."""
+    return sum(
+        len(PhraseMatcher(index, THRESHOLD).match_events(transcript))
+        for transcript in transcripts
+    )
+
+
+def _batched(index: PhraseIndex, transcripts: list[str]) -> int:
+    """Match all calls in one vectorized pass."""
+    results = match_events_batch(
+        [(PhraseMatcher(index, THRESHOLD), transcript) for transcript in transcripts]
+    )
+    return sum(len(events) for events in results)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng)
+    events = phrase_events(rng, words, args.events)
+    phrases = [phrase for event in events for phrase in event["phrases"]]
+    index = PhraseIndex(EventPhrasesList(events), fuzzy=True)
+
+    # Build the per-index arrays up front, as a long running index would have.
+    index.batch_fuzzy_candidates(
+        [(literal.text, literal.size) for literal in index.literals]
+    )
+    print(f"{len(index.literals)} literal phrases")
+    print(f"{'calls':>6} {'method':>9} {'seconds':>9} {'matches':>8}")
+    for calls in CALL_COUNTS:
+        transcripts = _transcripts(rng, words, phrases, calls)
+        for name, method in (
+            ("pairwise", _pairwise),
+            ("indexed", _indexed),
+            ("batched", _batched),
+        ):
+            start = time.perf_counter()
+            matches = method(index, transcripts)
+            print(
+                f"{calls:>6} {name:>9} {time.perf_counter() - start:>9.4f} {matches:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Local stand-in for the Twilio REST API used by the integration."""
+
+import asyncio
+import json
+import re
+from itertools import count
+from typing import Any
+from urllib.parse import urlparse
+
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.http.response import Response
+from twilio.rest import Client
+
+ACCOUNT_SID = "AC" + "0" * 32
+AUTH_TOKEN = "fake"
+
+CALLS_PATH = re.compile(r"^/2010-04-01/Accounts/(?P<account>AC\w+)/Calls\.json$")
+CALL_PATH = re.compile(
+    r"^/2010-04-01/Accounts/(?P<account>AC\w+)/Calls/(?P<sid>CA\w+)\.json$"
+)
+TRANSCRIPTIONS_PATH = re.compile(
+    r"^/2010-04-01/Accounts/(?P<account>AC\w+)/Calls/(?P<sid>CA\w+)"
+    r"/Transcriptions\.json$"
+)
+
+
+class FakeTwilioHttpClient(AsyncTwilioHttpClient):
+    """Answers calls.create_async, transcriptions.create_async and update_async.
+
+    Requests never leave the process; each one is answered after ``latency``
+    seconds, like a round trip to the API would be. Created calls are kept
+    in ``calls`` by SID.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Initialize the fake."""
+        super().__init__(pool_connections=False)
+        self.latency = latency
+        self.calls: dict[str, dict[str, Any]] = {}
+        self.transcriptions: dict[str, dict[str, Any]] = {}
+        self.request_count = 0
+        self._sids = count(1)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: dict[str, object] | None = None,
+        data: dict[str, object] | None = None,
+        headers: dict[str, str] | None = None,
+        auth: tuple[str, str] | None = None,
+        timeout: float | None = None,
+        allow_redirects: bool = False,
+    ) -> Response:
+        """Answer a request as the Twilio API would."""
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        data = data or {}
+        path = urlparse(url).path
+        if method == "POST" and (match := CALLS_PATH.match(path)):
+            return self._create_call(match["account"], data)
+        if match := CALL_PATH.match(path):
+            call = self.calls.get(match["sid"], None)
+            if call is None:
+                return _not_found()
+            if method == "POST" and "Status" in data:
+                call["status"] = (
+                    "canceled" if call["status"] == "queued" else "completed"
+                )
+            return Response(200, json.dumps(call))
+        if method == "POST" and (match := TRANSCRIPTIONS_PATH.match(path)):
+            if match["sid"] not in self.calls:
+                return _not_found()
+            sid = f"GT{next(self._sids):032x}"
+            transcription = self.transcriptions[sid] = {
+                "sid": sid,
+                "account_sid": match["account"],
+                "call_sid": match["sid"],
+                "name": data.get("Name", None),
+                "status": "in-progress",
+            }
+            return Response(201, json.dumps(transcription))
+        return _not_found()
+
+    def _create_call(self, account_sid: str, data: dict[str, object]) -> Response:
+        """Create a call that is immediately in progress."""
+        sid = f"CA{next(self._sids):032x}"
+        call = self.calls[sid] = {
+            "sid": sid,
+            "account_sid": account_sid,
+            "to": data.get("To", None),
+            "from": data.get("From", None),
+            "status": "in-progress",
+            "direction": "outbound-api",
+        }
+        return Response(201, json.dumps(call))
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+
+def _not_found() -> Response:
+    """Answer like Twilio does for an unknown resource."""
+    return Response(
+        404,
+        json.dumps({"code": 20404, "message": "The requested resource was not found"}),
+    )
+
+
+def create_fake_client(latency: float = 0.0) -> Client:
+    """Create a Twilio client backed by the fake."""
+    return Client(
+        ACCOUNT_SID,
+        AUTH_TOKEN,
+        ACCOUNT_SID,
+        http_client=FakeTwilioHttpClient(latency),
+    )
@@ -0,0 +1,255 @@
+"""Load test the notify service against the Twilio stand-in.
+
+Places N live calls through TwilioCallLiveNotificationService, backed by
+FakeTwilioHttpClient, then replays a webhook stream per call on the event bus
+at a fixed rate. Each call's stream says a phrase only that call listens for,
+and the time from the delivery completing that phrase to its event firing is
+the end-to-end latency. Run from the repository root:
+
+    python -m benchmarks.load_test --calls 1 10 100 1000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.components.twilio import RECEIVED_DATA
+from homeassistant.config_entries import ConfigEntries
+from homeassistant.core import Event, HomeAssistant
+
+from benchmarks.fake_twilio import FakeTwilioHttpClient, create_fake_client
+from benchmarks.synthetic import load_stream, misspell, partial_stream, vocabulary
+from custom_components.twilio_call_live.const import (
+    CONF_CALLS_PER_SECOND,
+    CONF_FROM_NUMBER,
+    CONF_MATCH_EXECUTOR,
+    CONF_MAX_CONCURRENT_CALLS,
+    CONF_PHRASE_EVENTS,
+    DEFAULT_MATCH_EXECUTOR,
+    EXECUTOR_LOOP,
+    EXECUTOR_THREAD,
+)
+from custom_components.twilio_call_live.notify import TwilioCallLiveNotificationService
+
+Stream = list[tuple[str, bool]]
+
+
+def _call_streams(
+    rng: random.Random,
+    calls: int,
+    words: list[str],
+    call_words: int,
+    partial_rate: float,
+    recorded: list[Path] | None,
+) -> tuple[list[Stream], list[str]]:
+    """Get a stream per call, and the phrase saying it ends with."""
+    streams: list[Stream] = []
+    triggers: list[str] = []
+    for call in range(calls):
+        stream = (
+            load_stream(recorded[call % len(recorded)])
+            if recorded
+            else partial_stream(rng, words, call_words, partial_rate)
+        )
+        trigger = " ".join(misspell(rng, word) for word in rng.sample(words, 3))
+        tokens = trigger.split()
+        for end in range(1, len(tokens)):
+            stream.append((" ".join(tokens[:end]), False))
+        stream.append((trigger, True))
+        streams.append(stream)
+        triggers.append(trigger)
+    return streams, triggers
+
+
+async def _replay(
+    hass: HomeAssistant,
+    call_sid: str,
+    stream: Stream,
+    trigger: str,
+    rate: float,
+    tail: float,
+    sent_at: dict[str, float],
+) -> int:
+    """Fire the webhook deliveries of a call on the bus, rate per second."""
+    # Spread the calls over the first interval, so they don't all tick at once.
+    await asyncio.sleep(random.random() / rate)
+    for sequence_id, (transcript, final) in enumerate(stream):
+        if transcript == trigger:
+            sent_at.setdefault(call_sid, time.monotonic())
+        hass.bus.async_fire(
+            RECEIVED_DATA,
+            {
+                "CallSid": call_sid,
+                "TranscriptionEvent": "transcription-content",
+                "TranscriptionData": json.dumps(
+                    {"transcript": transcript, "confidence": 0.9}
+                ),
+                "Final": "true" if final else "false",
+                "SequenceId": str(sequence_id),
+            },
+        )
+        await asyncio.sleep(1 / rate)
+    # Stay silent on the line, so the merger flushes on its own timer.
+    await asyncio.sleep(tail)
+    hass.bus.async_fire(
+        RECEIVED_DATA,
+        {"CallSid": call_sid, "CallStatus": "completed", "SequenceNumber": "3"},
+    )
+    return len(stream) + 1
+
+
+async def run(
+    calls: int,
+    rate: float,
+    tail: float,
+    streams: list[Stream],
+    triggers: list[str],
+    executor: str,
+    api_latency: float,
+) -> dict[str, Any]:
+    """Run the load test for one number of calls."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config_entries = ConfigEntries(hass, {})
+        client = create_fake_client(api_latency)
+        entry = SimpleNamespace(
+            options={
+                CONF_FROM_NUMBER: "+15550000000",
+                CONF_CALLS_PER_SECOND: 1000.0,
+                CONF_MAX_CONCURRENT_CALLS: 100,
+                CONF_MATCH_EXECUTOR: executor,
+                CONF_PHRASE_EVENTS: [
+                    {"event": f"load_test_{call}", "phrases": [trigger]}
+                    for call, trigger in enumerate(triggers)
+                ],
+            }
+        )
+        service = TwilioCallLiveNotificationService(hass, client, entry)  # type: ignore[arg-type]
+        service.hass = hass
+        unsubscribe = service._dispatcher.async_subscribe()
+
+        response = await service.initiate_call(
+            "Load test", [f"+1555{call:07d}" for call in range(calls)], True
+        )
+        call_sids = [result["sid"] for result in response["calls"]]
+        sent_at: dict[str, float] = {}
+        fired_at: dict[str, float] = {}
+        for call, call_sid in enumerate(call_sids):
+
+            def _on_event(event: Event, call_sid: str = call_sid) -> None:
+                fired_at.setdefault(call_sid, time.monotonic())
+
+            hass.bus.async_listen(f"load_test_{call}", _on_event)
+
+        start = time.monotonic()
+        deliveries = sum(
+            await asyncio.gather(
+                *[
+                    _replay(hass, call_sid, stream, trigger, rate, tail, sent_at)
+                    for call_sid, stream, trigger in zip(call_sids, streams, triggers)
+                ]
+            )
+        )
+        await hass.async_block_till_done()
+        elapsed = time.monotonic() - start
+
+        unsubscribe()
+        await service.async_hangup_all()
+        service._batcher.close()
+        service._hangup_scheduler.close()
+        await hass.async_stop(force=True)
+
+    http_client: FakeTwilioHttpClient = client.http_client  # type: ignore[assignment]
+    latencies = [
+        fired_at[call_sid] - sent_at[call_sid]
+        for call_sid in call_sids
+        if call_sid in fired_at and call_sid in sent_at
+    ]
+    return {
+        "calls": len(call_sids),
+        "deliveries": deliveries,
+        "elapsed": elapsed,
+        "fired": len(latencies),
+        "latencies": latencies,
+        "requests": http_client.request_count,
+    }
+
+
+def main() -> None:
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument(
+        "--rate", type=float, default=5.0, help="deliveries per second per call"
+    )
+    parser.add_argument(
+        "--tail", type=float, default=3.0, help="seconds of silence before hanging up"
+    )
+    parser.add_argument("--words", type=int, default=40, help="words per call")
+    parser.add_argument(
+        "--partial-rate", type=float, default=1.0, help="partial results per word"
+    )
+    parser.add_argument(
+        "--executor",
+        choices=[EXECUTOR_LOOP, EXECUTOR_THREAD],
+        default=DEFAULT_MATCH_EXECUTOR,
+    )
+    parser.add_argument(
+        "--api-latency", type=float, default=0.05, help="seconds per REST request"
+    )
+    parser.add_argument(
+        "--recorded",
+        type=Path,
+        action="append",
+        help="JSONL stream to replay before each call's phrase",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng)
+    print(
+        f"{'calls':>6} {'deliveries':>10} {'per s':>8} {'fired':>6} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'requests':>8}"
+    )
+    for calls in args.calls:
+        streams, triggers = _call_streams(
+            rng, calls, words, args.words, args.partial_rate, args.recorded
+        )
+        result = asyncio.run(
+            run(
+                calls,
+                args.rate,
+                args.tail,
+                streams,
+                triggers,
+                args.executor,
+                args.api_latency,
+            )
+        )
+        latencies = sorted(result["latencies"])
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p99 = percentiles[49], percentiles[98]
+        else:
+            p50 = p99 = latencies[0] if latencies else float("nan")
+        print(
+            f"{result['calls']:>6} {result['deliveries']:>10} "
+            f"{result['deliveries'] / result['elapsed']:>8.0f} "
+            f"{result['fired']:>6} {p50 * 1e3:>8.1f} {p99 * 1e3:>8.1f} "
+            f"{(latencies[-1] if latencies else float('nan')) * 1e3:>8.1f} "
+            f"{result['requests']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Benchmark the transcription pipeline on partial-result streams.
+
+Replays one stream of (transcript, final) segments per call through
+TranscriptionMerger.add_segment, TranscriptionMerger.merge_segments and
+PhraseMatcher.phrase_match_event. Run from the repository root:
+
+    python -m benchmarks.pipeline --calls 20 --words 600 --partial-rate 2
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.synthetic import load_stream, partial_stream, phrase_events, vocabulary
+from custom_components.twilio_call_live.phrase_index import get_phrase_index
+from custom_components.twilio_call_live.transcription_utils import (
+    PhraseMatcher,
+    TranscriptionMerger,
+)
+
+Stream = list[tuple[str, bool]]
+
+
+def _add_segment(streams: list[Stream], phrase_events: list[dict]) -> list[float]:
+    """Time each add_segment call, flushing after every final segment."""
+    latencies: list[float] = []
+    for stream in streams:
+        merger = TranscriptionMerger(lambda transcript: None)
+        for transcript, final in stream:
+            start = time.perf_counter()
+            merger.add_segment(transcript, final)
+            latencies.append(time.perf_counter() - start)
+            if final:
+                merger.flush_buffer()
+    return latencies
+
+
+def _merge_segments(streams: list[Stream], phrase_events: list[dict]) -> list[float]:
+    """Time merge_segments over the segments of each utterance."""
+    latencies: list[float] = []
+    merger = TranscriptionMerger(lambda transcript: None)
+    for stream in streams:
+        utterance: list[str] = []
+        for transcript, final in stream:
+            utterance.append(transcript)
+            if final:
+                start = time.perf_counter()
+                merger.merge_segments(utterance, final)
+                latencies.append(time.perf_counter() - start)
+                utterance = []
+    return latencies
+
+
+def _phrase_match_event(
+    streams: list[Stream], phrase_events: list[dict]
+) -> list[float]:
+    """Time phrase_match_event on the transcripts the merger flushes."""
+    index = get_phrase_index(phrase_events)
+    latencies: list[float] = []
+    for stream in streams:
+        flushed: list[str] = []
+        merger = TranscriptionMerger(flushed.append)
+        for transcript, final in stream:
+            merger.add_segment(transcript, final)
+            if final:
+                merger.flush_buffer()
+        matcher = PhraseMatcher(index)
+        for transcript in flushed:
+            start = time.perf_counter()
+            event = matcher.phrase_match_event(transcript)
+            latencies.append(time.perf_counter() - start)
+            if event is not None:
+                matcher.mark_fired(event)
+    return latencies
+
+
+BENCHMARKS: dict[str, Callable[[list[Stream], list[dict]], list[float]]] = {
+    "add_segment": _add_segment,
+    "merge_segments": _merge_segments,
+    "phrase_match_event": _phrase_match_event,
+}
+
+
+def _peak_memory(
+    benchmark: Callable[[list[Stream], list[dict]], list[float]],
+    streams: list[Stream],
+    events: list[dict],
+) -> int:
+    """Run the benchmark again under tracemalloc and get its peak in bytes."""
+    tracemalloc.start()
+    try:
+        benchmark(streams, events)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20, help="concurrent calls")
+    parser.add_argument("--words", type=int, default=600, help="words per call")
+    parser.add_argument(
+        "--partial-rate", type=float, default=2.0, help="partial results per word"
+    )
+    parser.add_argument("--phrases", type=int, default=200, help="phrase events")
+    parser.add_argument(
+        "--recorded",
+        type=Path,
+        action="append",
+        help="JSONL stream to replay, once per call, instead of synthetic ones",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng)
+    events = phrase_events(rng, words, args.phrases)
+    if args.recorded:
+        streams = [
+            load_stream(args.recorded[call % len(args.recorded)])
+            for call in range(args.calls)
+        ]
+    else:
+        phrases = [phrase for event in events for phrase in event["phrases"]]
+        streams = [
+            partial_stream(rng, words, args.words, args.partial_rate, phrases)
+            for _ in range(args.calls)
+        ]
+    get_phrase_index(events)
+
+    print(
+        f"{args.calls} calls, {sum(map(len, streams))} segments, "
+        f"{args.phrases} phrase events"
+    )
+    print(
+        f"{'benchmark':<20} {'ops':>8} {'ops/s':>10} "
+        f"{'p50 us':>9} {'p99 us':>9} {'peak KiB':>9}"
+    )
+    for name in args.only or BENCHMARKS:
+        benchmark = BENCHMARKS[name]
+        latencies = benchmark(streams, events)
+        if len(latencies) < 2:
+            print(f"{name:<20} {len(latencies):>8} (not enough operations)")
+            continue
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        peak = _peak_memory(benchmark, streams, events)
+        print(
+            f"{name:<20} {len(latencies):>8} {len(latencies) / sum(latencies):>10.0f} "
+            f"{percentiles[49] * 1e6:>9.1f} {percentiles[98] * 1e6:>9.1f} "
+            f"{peak / 1024:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
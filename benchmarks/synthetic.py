@@ -0,0 +1,96 @@
+"""Synthetic and recorded inputs shared by the benchmarks."""
+
+import json
+import random
+import string
+from pathlib import Path
+from typing import Any
+
+
+def random_word(rng: random.Random) -> str:
+    """Get a random lowercase word."""
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+
+
+def vocabulary(rng: random.Random, size: int = 2000) -> list[str]:
+    """Get a list of random words."""
+    return [random_word(rng) for _ in range(size)]
+
+
+def phrase_events(
+    rng: random.Random, words: list[str], events: int, phrases_per_event: int = 3
+) -> list[dict[str, Any]]:
+    """Get phrase events options with literal phrases of 2 to 4 words."""
+    return [
+        {
+            "event": f"event_{event}",
+            "phrases": [
+                " ".join(rng.choices(words, k=rng.randint(2, 4)))
+                for _ in range(phrases_per_event)
+            ],
+        }
+        for event in range(events)
+    ]
+
+
+def misspell(rng: random.Random, word: str) -> str:
+    """Replace one character of the word."""
+    chars = list(word)
+    chars[rng.randrange(len(chars))] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def partial_stream(
+    rng: random.Random,
+    words: list[str],
+    call_words: int,
+    partial_rate: float,
+    phrases: list[str] | None = None,
+    utterance_words: tuple[int, int] = (4, 12),
+) -> list[tuple[str, bool]]:
+    """Generate the (transcript, final) segments Twilio sends for one call.
+
+    The call is cut into utterances. After each spoken word, ``partial_rate``
+    partial results on average revise the utterance so far, the newest word
+    sometimes misheard, and each utterance ends with its final result. Half
+    of the utterances contain one of the phrases, if given.
+    """
+    segments: list[tuple[str, bool]] = []
+    spoken = 0
+    while spoken < call_words:
+        utterance = rng.choices(words, k=rng.randint(*utterance_words))
+        if phrases and rng.random() < 0.5:
+            utterance[rng.randrange(len(utterance)) :] = rng.choice(phrases).split()
+        utterance = utterance[: call_words - spoken]
+        spoken += len(utterance)
+        for end in range(1, len(utterance) + 1):
+            partials = int(partial_rate) + (rng.random() < partial_rate % 1)
+            for _ in range(partials):
+                heard = utterance[:end]
+                if rng.random() < 0.3:
+                    heard = heard[:-1] + [misspell(rng, heard[-1])]
+                segments.append((" ".join(heard), False))
+        segments.append((" ".join(utterance), True))
+    return segments
+
+
+def load_stream(path: Path) -> list[tuple[str, bool]]:
+    """Load a recorded stream of segments.
+
+    Each line is a JSON object: either a segment with ``transcript`` and
+    ``final``, or a webhook delivery with ``TranscriptionData`` and ``Final``.
+    """
+    segments: list[tuple[str, bool]] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "TranscriptionData" in record:
+            transcript = json.loads(record["TranscriptionData"]).get("transcript")
+            final = record.get("Final") == "true"
+        else:
+            transcript = record.get("transcript")
+            final = bool(record.get("final", False))
+        if transcript:
+            segments.append((transcript, final))
+    return segments
@@ -1,24 +1,80 @@
 """The twilio_call_live component."""
 
+from datetime import datetime
+from functools import partial
+from pathlib import Path
 from typing import Any, override
 import asyncio
 import logging
-from homeassistant.core import HomeAssistant, callback
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.const import Platform
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
 from homeassistant.components.twilio.const import DOMAIN as TWILIO_DOMAIN
 from homeassistant.components.webhook import async_generate_url
-from homeassistant.helpers import discovery
+from homeassistant.helpers import config_validation as cv, discovery
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.event import _TypedDictT
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    ATTR_CALL_SID,
+    ATTR_DURATION,
+    ATTR_ENABLED,
+    ATTR_LIMIT,
+    ATTR_QUERY,
+    ATTR_SINCE,
+    ATTR_UNTIL,
+    CONF_TRANSCRIPT_LOG,
+    DATA_METRICS,
+    DATA_SERVICE,
+    DATA_TRANSCRIPT_INDEX,
+    DEFAULT_TRANSCRIPT_LOG,
     DOMAIN,
+    PROFILE_REPORT_FILE,
+    SERVICE_PROFILE,
+    SERVICE_SEARCH_TRANSCRIPTS,
+)
+from .metrics import IntegrationMetrics
+from .profiling import DEFAULT_PROFILE_DURATION, MAX_PROFILE_DURATION
+from .transcript_index import (
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    TRANSCRIPT_INDEX_FILE,
+    TranscriptIndex,
 )
+from .transcript_store import TRANSCRIPT_DIRECTORY
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.NOTIFY]
+PLATFORMS: list[Platform] = [Platform.NOTIFY, Platform.SENSOR]
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENABLED): cv.boolean,
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+    }
+)
+SEARCH_TRANSCRIPTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_QUERY): vol.All(cv.string, vol.Length(min=1)),
+        vol.Optional(ATTR_SINCE): cv.datetime,
+        vol.Optional(ATTR_UNTIL): cv.datetime,
+        vol.Optional(ATTR_CALL_SID): cv.string,
+        vol.Optional(ATTR_LIMIT, default=DEFAULT_SEARCH_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_SEARCH_LIMIT)
+        ),
+    }
+)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -26,6 +82,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.info("async_setup_entry")
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = entry
+    hass.data[DATA_METRICS] = IntegrationMetrics()
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        partial(_async_profile, hass),
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    if entry.options.get(CONF_TRANSCRIPT_LOG, DEFAULT_TRANSCRIPT_LOG):
+        hass.data[DATA_TRANSCRIPT_INDEX] = TranscriptIndex(
+            Path(hass.config.path(TRANSCRIPT_DIRECTORY, TRANSCRIPT_INDEX_FILE))
+        )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEARCH_TRANSCRIPTS,
+        partial(_async_search_transcripts, hass),
+        schema=SEARCH_TRANSCRIPTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     if hass.is_running:
         """Initialize immediately"""
@@ -59,6 +134,71 @@ async def async_init(hass: HomeAssistant, entry: ConfigEntry, twilio_live_call:
     return True
 
 
+async def _async_profile(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Start or stop profiling the transcription pipeline."""
+    profiler = hass.data[DATA_METRICS].profiler
+    if call.data[ATTR_ENABLED]:
+        profiler.start(
+            hass.loop,
+            call.data[ATTR_DURATION],
+            lambda report: hass.async_create_task(_async_write_report(hass, report)),
+        )
+        return {ATTR_ENABLED: True, "report_path": None}
+    report = profiler.stop()
+    return {
+        ATTR_ENABLED: False,
+        "report_path": (
+            await _async_write_report(hass, report) if report is not None else None
+        ),
+    }
+
+
+async def _async_write_report(hass: HomeAssistant, report: str) -> str:
+    """Write the profile report to the config directory, returning its path."""
+    path = hass.config.path(PROFILE_REPORT_FILE)
+    await hass.async_add_executor_job(Path(path).write_text, report, "utf-8")
+    _LOGGER.info("Wrote the profile report to %s", path)
+    return path
+
+
+async def _async_search_transcripts(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Find the logged transcripts containing a phrase, newest first."""
+    index: TranscriptIndex | None = hass.data.get(DATA_TRANSCRIPT_INDEX, None)
+    if index is None:
+        raise ServiceValidationError("The transcript log is off")
+    since = call.data.get(ATTR_SINCE, None)
+    until = call.data.get(ATTR_UNTIL, None)
+    results = await hass.async_add_executor_job(
+        index.search,
+        call.data[ATTR_QUERY],
+        _as_timestamp(since),
+        _as_timestamp(until),
+        call.data.get(ATTR_CALL_SID, None),
+        call.data[ATTR_LIMIT],
+    )
+    return {
+        "results": [
+            {
+                "call_sid": result["call_sid"],
+                "time": dt_util.utc_from_timestamp(result["time"]).isoformat(),
+                "snippet": result["snippet"],
+            }
+            for result in results
+        ]
+    }
+
+
+def _as_timestamp(value: datetime | None) -> float | None:
+    """Get the timestamp of a service call datetime, naive ones being local."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_timestamp(value)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     _LOGGER.info("🔄 Reloading entry %s", entry)
@@ -72,10 +212,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     twilio_config = hass.data[DOMAIN].get(entry.entry_id, None)
     if twilio_config is not None and hasattr(twilio_config, "cleanup"):
         twilio_config.cleanup()
+    metrics = hass.data.get(DATA_METRICS, None)
+    if metrics is not None:
+        metrics.profiler.stop()
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_SEARCH_TRANSCRIPTS)
 
     unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unloaded:
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data.pop(DATA_SERVICE, None)
+        hass.data.pop(DATA_METRICS, None)
+        index = hass.data.pop(DATA_TRANSCRIPT_INDEX, None)
+        if index is not None:
+            await hass.async_add_executor_job(index.close)
         _LOGGER.warning("Unloaded successfully %s", entry.entry_id)
     else:
         _LOGGER.error("Couldn't unload config entry %s", entry.entry_id)
@@ -0,0 +1,56 @@
+"""Async Twilio client owned by the integration."""
+
+from aiohttp import ClientSession, TCPConnector
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.http.response import Response
+from twilio.rest import Client
+
+
+class PooledAsyncHttpClient(AsyncTwilioHttpClient):
+    """Async Twilio HTTP client backed by a bounded keep-alive connection pool."""
+
+    def __init__(
+        self, pool_size: int, timeout: float, keepalive_timeout: float
+    ) -> None:
+        """Initialize the client and its connection pool."""
+        super().__init__(pool_connections=False, timeout=timeout)
+        self.session = ClientSession(
+            connector=TCPConnector(limit=pool_size, keepalive_timeout=keepalive_timeout)
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: dict[str, object] | None = None,
+        data: dict[str, object] | None = None,
+        headers: dict[str, str] | None = None,
+        auth: tuple[str, str] | None = None,
+        timeout: float | None = None,
+        allow_redirects: bool = False,
+    ) -> Response:
+        """Make a request, applying the client timeout when none is given."""
+        return await super().request(
+            method,
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            auth=auth,
+            timeout=timeout if timeout is not None else self.timeout,
+            allow_redirects=allow_redirects,
+        )
+
+
+def create_async_client(
+    client: Client, pool_size: int, timeout: float, keepalive_timeout: float
+) -> Client:
+    """Create an async Twilio client with the credentials of the given client."""
+    return Client(
+        client.username,
+        client.password,
+        client.account_sid,
+        region=client.region,
+        edge=client.edge,
+        http_client=PooledAsyncHttpClient(pool_size, timeout, keepalive_timeout),
+    )
@@ -6,6 +6,10 @@ import logging
 from typing import Any, Awaitable, Callable, Coroutine
 from homeassistant.core import callback
 from homeassistant.helpers.selector import (
+    BooleanSelector,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
     TextSelector,
     TextSelectorConfig,
     TextSelectorType,
@@ -32,15 +36,42 @@ from .const import (
 )
 
 from .config import EventPhrases, EventPhrasesList, SystemValues
+from .phrase_index import invalidate_phrase_index_cache
 from .const import (
     CONF_ACTION,
+    CONF_CALLS_PER_SECOND,
     CONF_FROM_NUMBER,
+    CONF_FUZZY_MATCHING,
+    CONF_KEEPALIVE_TIMEOUT,
+    CONF_MATCH_EXECUTOR,
+    CONF_MATCH_QUEUE_DEPTH,
+    CONF_MAX_CONCURRENT_CALLS,
+    CONF_PHONETIC_MATCHING,
     CONF_PHRASE,
     CONF_PHRASE_EVENTS,
     CONF_PHRASES,
+    CONF_POOL_SIZE,
+    CONF_REQUEST_TIMEOUT,
+    CONF_TRANSCRIPT_LOG,
+    DEFAULT_CALLS_PER_SECOND,
+    DEFAULT_FUZZY_MATCHING,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_MATCH_EXECUTOR,
+    DEFAULT_MATCH_QUEUE_DEPTH,
+    DEFAULT_MAX_CONCURRENT_CALLS,
+    DEFAULT_PHONETIC_MATCHING,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_TRANSCRIPT_LOG,
     DOMAIN,
+    EXECUTOR_LOOP,
+    EXECUTOR_PROCESS,
+    EXECUTOR_THREAD,
     FROM_NUMBER_PATTERN,
     FROM_NUMBER_REPLACER,
+    PHONETIC_METAPHONE,
+    PHONETIC_NYSIIS,
+    PHONETIC_OFF,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -53,6 +84,7 @@ STEP_LIST_EVENTS = "list_events"
 STEP_LIST_PHRASES = "list_phrases"
 STEP_EDIT_EVENT = "edit_event"
 STEP_EDIT_PHRASE = "edit_phrase"
+STEP_SETTINGS = "settings"
 STEP_SAVE = "save"
 STEP_EXIT = "exit"
 
@@ -92,6 +124,93 @@ OPTIONS_SCHEMA = vol.Schema(
 )
 
 
+SETTINGS_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_CALLS_PER_SECOND, default=DEFAULT_CALLS_PER_SECOND
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min=0.1, max=100, step=0.1, mode=NumberSelectorMode.BOX
+            )
+        ),
+        vol.Required(
+            CONF_MAX_CONCURRENT_CALLS, default=DEFAULT_MAX_CONCURRENT_CALLS
+        ): vol.All(
+            NumberSelector(
+                NumberSelectorConfig(
+                    min=1, max=500, step=1, mode=NumberSelectorMode.BOX
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Required(CONF_POOL_SIZE, default=DEFAULT_POOL_SIZE): vol.All(
+            NumberSelector(
+                NumberSelectorConfig(
+                    min=1, max=500, step=1, mode=NumberSelectorMode.BOX
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Required(
+            CONF_REQUEST_TIMEOUT, default=DEFAULT_REQUEST_TIMEOUT
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min=1,
+                max=120,
+                step=1,
+                unit_of_measurement="s",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Required(
+            CONF_KEEPALIVE_TIMEOUT, default=DEFAULT_KEEPALIVE_TIMEOUT
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min=1,
+                max=300,
+                step=1,
+                unit_of_measurement="s",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Required(
+            CONF_PHONETIC_MATCHING, default=DEFAULT_PHONETIC_MATCHING
+        ): SelectSelector(
+            SelectSelectorConfig(
+                options=[PHONETIC_OFF, PHONETIC_METAPHONE, PHONETIC_NYSIIS],
+                mode=SelectSelectorMode.DROPDOWN,
+                translation_key=CONF_PHONETIC_MATCHING,
+            )
+        ),
+        vol.Required(
+            CONF_FUZZY_MATCHING, default=DEFAULT_FUZZY_MATCHING
+        ): BooleanSelector(),
+        vol.Required(
+            CONF_MATCH_EXECUTOR, default=DEFAULT_MATCH_EXECUTOR
+        ): SelectSelector(
+            SelectSelectorConfig(
+                options=[EXECUTOR_LOOP, EXECUTOR_THREAD, EXECUTOR_PROCESS],
+                mode=SelectSelectorMode.DROPDOWN,
+                translation_key=CONF_MATCH_EXECUTOR,
+            )
+        ),
+        vol.Required(
+            CONF_MATCH_QUEUE_DEPTH, default=DEFAULT_MATCH_QUEUE_DEPTH
+        ): vol.All(
+            NumberSelector(
+                NumberSelectorConfig(
+                    min=1, max=1000, step=1, mode=NumberSelectorMode.BOX
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Required(
+            CONF_TRANSCRIPT_LOG, default=DEFAULT_TRANSCRIPT_LOG
+        ): BooleanSelector(),
+    }
+)
+
+
 def _pop_sys_keys(user_input: dict[str, Any] | None) -> SystemValues:
     """Pop the system keys out of the user input."""
     if user_input is None:
@@ -168,6 +287,11 @@ class OptionsFlowHandler(OptionsFlowWithConfigEntry):
         self._event_phrases = EventPhrasesList(
             config_entry.options.get(CONF_PHRASE_EVENTS, [])
         )
+        self._settings = {
+            str(key): config_entry.options[str(key)]
+            for key in SETTINGS_SCHEMA.schema
+            if str(key) in config_entry.options
+        }
         self.values = SystemValues()
 
     async def async_step_user(
@@ -499,19 +623,38 @@ class OptionsFlowHandler(OptionsFlowWithConfigEntry):
             step_id="menu",
             menu_options={
                 STEP_LIST_EVENTS: "Edit Events",
+                STEP_SETTINGS: "Settings",
                 STEP_SAVE: "Save Changes and Close",
                 STEP_EXIT: "Close Without Save",
             },
         )
 
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Handle the performance settings."""
+        _LOGGER.info("Step: %s", STEP_SETTINGS)
+        if user_input is not None:
+            self._settings.update(user_input)
+            return await self.async_step_menu()
+
+        return self.async_show_form(
+            step_id=STEP_SETTINGS,
+            data_schema=self.add_suggested_values_to_schema(
+                SETTINGS_SCHEMA, self._settings
+            ),
+        )
+
     async def async_step_save(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Save and close the config flow."""
+        invalidate_phrase_index_cache()
         return self.async_create_entry(
             title=DOMAIN,
             data={
                 **self.config_entry.data,
+                **self._settings,
                 CONF_PHRASE_EVENTS: [event.to_dict() for event in self._event_phrases],
             },
         )
@@ -3,15 +3,63 @@
 import re
 
 DOMAIN = "twilio_call_live"
+DATA_METRICS = f"{DOMAIN}_metrics"
+DATA_SERVICE = f"{DOMAIN}_service"
+DATA_TRANSCRIPT_INDEX = f"{DOMAIN}_transcript_index"
 
 ATTR_PROCESS_LIVE = "process_live"
 ATTR_HANGUP_AFTER = "hangup_after"
+ATTR_TO_NUMBER = "to_number"
+ATTR_STATUS = "status"
+ATTR_ENABLED = "enabled"
+ATTR_DURATION = "duration"
+ATTR_QUERY = "query"
+ATTR_SINCE = "since"
+ATTR_UNTIL = "until"
+ATTR_CALL_SID = "call_sid"
+ATTR_LIMIT = "limit"
+
+SERVICE_PROFILE = "profile"
+SERVICE_SEARCH_TRANSCRIPTS = "search_transcripts"
+PROFILE_REPORT_FILE = "twilio_call_live_profile.txt"
+
+STATUS_INITIATED = "initiated"
+STATUS_FAILED = "failed"
 
 CONF_FROM_NUMBER = "from_number"
 CONF_PHRASE_EVENTS = "phrase_events"
 CONF_PHRASE = "phrase"
 CONF_PHRASES = "phrases"
 CONF_ACTION = "action"
+CONF_CALLS_PER_SECOND = "calls_per_second"
+CONF_MAX_CONCURRENT_CALLS = "max_concurrent_calls"
+CONF_POOL_SIZE = "pool_size"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_KEEPALIVE_TIMEOUT = "keepalive_timeout"
+CONF_PHONETIC_MATCHING = "phonetic_matching"
+CONF_FUZZY_MATCHING = "fuzzy_matching"
+CONF_MATCH_EXECUTOR = "match_executor"
+CONF_MATCH_QUEUE_DEPTH = "match_queue_depth"
+CONF_TRANSCRIPT_LOG = "transcript_log"
+
+PHONETIC_OFF = "off"
+PHONETIC_METAPHONE = "metaphone"
+PHONETIC_NYSIIS = "nysiis"
+
+EXECUTOR_LOOP = "loop"
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+DEFAULT_CALLS_PER_SECOND = 1.0
+DEFAULT_MAX_CONCURRENT_CALLS = 10
+DEFAULT_POOL_SIZE = 20
+DEFAULT_REQUEST_TIMEOUT = 10.0
+DEFAULT_KEEPALIVE_TIMEOUT = 30.0
+DEFAULT_PHONETIC_MATCHING = PHONETIC_OFF
+DEFAULT_FUZZY_MATCHING = False
+DEFAULT_MATCH_EXECUTOR = EXECUTOR_THREAD
+DEFAULT_MATCH_QUEUE_DEPTH = 20
+DEFAULT_TRANSCRIPT_LOG = False
 
 FROM_NUMBER_REPLACER_REGEX = r"[^0-9\+]"
 FROM_NUMBER_REPLACER = re.compile(FROM_NUMBER_REPLACER_REGEX)
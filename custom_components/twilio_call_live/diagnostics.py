@@ -0,0 +1,22 @@
+"""Diagnostics support for twilio_call_live."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_FROM_NUMBER, DATA_METRICS
+
+TO_REDACT = {CONF_FROM_NUMBER}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Get the options and the metrics of the config entry."""
+    metrics = hass.data.get(DATA_METRICS, None)
+    return {
+        "options": async_redact_data(entry.options, TO_REDACT),
+        "metrics": metrics.as_dict() if metrics is not None else None,
+    }
@@ -0,0 +1,66 @@
+"""Routes Twilio webhook events to the call they belong to."""
+
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.components.twilio import RECEIVED_DATA
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import _TypedDictT
+
+from .profiling import Profiler
+from .webhook import delivery_key, parse_webhook
+
+if TYPE_CHECKING:
+    from .twilio_call import TwilioCall
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TwilioDataDispatcher:
+    """Single bus subscriber that dispatches webhook data by CallSid.
+
+    Deliveries Twilio retried are dropped here, before the call parses them.
+    """
+
+    def __init__(self, hass: HomeAssistant, profiler: Profiler) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self.profiler = profiler
+        self._calls: dict[str, "TwilioCall"] = {}
+
+    @callback
+    def async_subscribe(self) -> CALLBACK_TYPE:
+        """Subscribe to the Twilio webhook event, returns the unsubscribe callback."""
+        return self.hass.bus.async_listen(RECEIVED_DATA, self._async_on_data_received)
+
+    @callback
+    def async_register(self, call_sid: str, call: "TwilioCall") -> None:
+        """Route events for the given CallSid to the call."""
+        self._calls[call_sid] = call
+
+    @callback
+    def async_unregister(self, call_sid: str) -> None:
+        """Stop routing events for the given CallSid."""
+        self._calls.pop(call_sid, None)
+
+    @callback
+    def _async_on_data_received(self, event: Event[_TypedDictT]) -> None:
+        """Hand the event to the call it belongs to, if any."""
+        received_at = time.perf_counter()
+        call_sid = event.data.get("CallSid", None)
+        if call_sid is None:
+            return
+        call = self._calls.get(call_sid, None)
+        if call is None:
+            return
+        if call.deliveries.is_duplicate(delivery_key(event.data)):
+            _LOGGER.debug("Dropping duplicate delivery for call %s", call_sid)
+            call.metrics.duplicate_deliveries.add()
+            return
+        payload = parse_webhook(call_sid, event.data)
+        if self.profiler.enabled:
+            self.profiler.record("parse", received_at)
+        if payload is None:
+            return
+        self.hass.async_create_task(call.on_twilio_data_received(payload, received_at))
@@ -0,0 +1,183 @@
+"""Latency and throughput metrics of the integration."""
+
+from bisect import bisect_left
+import time
+from typing import Any
+
+from .profiling import Profiler
+
+LATENCY_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+RATE_WINDOW = 60
+
+
+class Histogram:
+    """Histogram with fixed bucket bounds.
+
+    Observing a value is a bisect and two additions, and the memory used never
+    grows. Quantiles are estimated by interpolating within the bucket they
+    fall in, so they are only as precise as the buckets. Without
+    ``interpolate``, the upper bound of that bucket is the estimate, which
+    suits histograms of whole numbers.
+    """
+
+    __slots__ = ("bounds", "interpolate", "counts", "count", "total")
+
+    def __init__(
+        self, bounds: tuple[float, ...] = LATENCY_BUCKETS, interpolate: bool = True
+    ) -> None:
+        """Initialize the histogram."""
+        self.bounds = bounds
+        self.interpolate = interpolate
+        # The last bucket counts the values above the highest bound.
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Count a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float, counts: list[int] | None = None) -> float | None:
+        """Estimate the q-quantile of the values, or of the given bucket counts."""
+        if counts is None:
+            counts = self.counts
+        count = sum(counts)
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for bucket, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if bucket == len(self.bounds):
+                    return float(self.bounds[-1])
+                if not self.interpolate:
+                    return float(self.bounds[bucket])
+                lower = self.bounds[bucket - 1] if bucket else 0.0
+                upper = self.bounds[bucket]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return float(self.bounds[-1])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the histogram for the diagnostics."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.bounds, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class RateCounter:
+    """Counts occurrences over the last minute, in one slot per second."""
+
+    __slots__ = ("count", "_counts", "_seconds")
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.count = 0
+        self._counts = [0] * RATE_WINDOW
+        self._seconds = [0] * RATE_WINDOW
+
+    def add(self, amount: int = 1) -> None:
+        """Count occurrences now."""
+        second = int(time.monotonic())
+        slot = second % RATE_WINDOW
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += amount
+        self.count += amount
+
+    def per_minute(self) -> int:
+        """Get the occurrences counted during the last minute."""
+        oldest = int(time.monotonic()) - RATE_WINDOW
+        return sum(
+            count
+            for count, second in zip(self._counts, self._seconds)
+            if second > oldest
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the counter for the diagnostics."""
+        return {"count": self.count, "per_minute": self.per_minute()}
+
+
+class IntegrationMetrics:
+    """Metrics shared by the notify service, its calls and the sensors.
+
+    Latencies are in seconds:
+
+    - ``call_setup``: from the service call to Twilio creating the call,
+      including the wait for the rate limiter.
+    - ``first_transcript``: from the service call to the first transcription
+      segment of a live call.
+    - ``webhook``: handling a webhook delivery, from the bus event to the
+      segment being queued for its call.
+    - ``merge``: merging a transcription segment into the call's transcript.
+    - ``flush``: from the first segment buffered by a call's merger to the
+      transcript being flushed for matching.
+    - ``match``: matching a batch of flushed transcripts against the phrases.
+    - ``queue_depth``: the segments queued for a call, when one is queued.
+    - ``events_fired``: the phrase events fired.
+    - ``duplicate_deliveries``: the retried webhook deliveries that were dropped.
+
+    ``profiler`` times the pipeline stages in more detail, while switched on.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.call_setup = Histogram()
+        self.first_transcript = Histogram()
+        self.webhook = Histogram()
+        self.merge = Histogram()
+        self.flush = Histogram()
+        self.match = Histogram()
+        self.queue_depth = Histogram(DEPTH_BUCKETS, interpolate=False)
+        self.events_fired = RateCounter()
+        self.duplicate_deliveries = RateCounter()
+        self.profiler = Profiler()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the metrics for the diagnostics."""
+        return {
+            "call_setup": self.call_setup.as_dict(),
+            "first_transcript": self.first_transcript.as_dict(),
+            "webhook": self.webhook.as_dict(),
+            "merge": self.merge.as_dict(),
+            "flush": self.flush.as_dict(),
+            "match": self.match.as_dict(),
+            "queue_depth": self.queue_depth.as_dict(),
+            "events_fired": self.events_fired.as_dict(),
+            "duplicate_deliveries": self.duplicate_deliveries.as_dict(),
+            "profiler": self.profiler.as_dict(),
+        }
@@ -1,15 +1,25 @@
 """Support for twilio_call_live notify."""
 
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
+from functools import partial
+import multiprocessing
+from pathlib import Path
 import voluptuous as vol
 from typing import Any, override
 import logging
+import time
 
 from twilio.base.exceptions import TwilioRestException
 from twilio.rest import Client
-from urllib import parse as parse_url
 
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_WEBHOOK_ID
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
@@ -32,20 +42,57 @@ from homeassistant.helpers.selector import (
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import _TypedDictT
 
+from .client import create_async_client
+from .dispatcher import TwilioDataDispatcher
+from .metrics import IntegrationMetrics
+from .phrase_index import PhraseIndex, get_phrase_index, phrase_index_key
+from .rate_limit import TokenBucket
+from .scheduler import TimerWheel
+from .transcript_index import TranscriptIndex
+from .transcript_store import TRANSCRIPT_DIRECTORY, TranscriptStore
+from .transcription_utils import MatchBatcher, init_match_worker
 from .twilio_call import TwilioCall
 
 from .const import (
     ATTR_HANGUP_AFTER,
     ATTR_PROCESS_LIVE,
+    ATTR_STATUS,
+    ATTR_TO_NUMBER,
+    CONF_CALLS_PER_SECOND,
     CONF_FROM_NUMBER,
+    CONF_FUZZY_MATCHING,
+    CONF_KEEPALIVE_TIMEOUT,
+    CONF_MATCH_EXECUTOR,
+    CONF_MATCH_QUEUE_DEPTH,
+    CONF_MAX_CONCURRENT_CALLS,
+    CONF_PHONETIC_MATCHING,
     CONF_PHRASE_EVENTS,
-    DOMAIN,
+    CONF_POOL_SIZE,
+    CONF_REQUEST_TIMEOUT,
+    CONF_TRANSCRIPT_LOG,
+    DATA_METRICS,
+    DATA_SERVICE,
+    DATA_TRANSCRIPT_INDEX,
+    DEFAULT_CALLS_PER_SECOND,
+    DEFAULT_FUZZY_MATCHING,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_MATCH_EXECUTOR,
+    DEFAULT_MATCH_QUEUE_DEPTH,
+    DEFAULT_MAX_CONCURRENT_CALLS,
+    DEFAULT_PHONETIC_MATCHING,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_TRANSCRIPT_LOG,
+    EXECUTOR_PROCESS,
+    STATUS_FAILED,
+    STATUS_INITIATED,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_NAME = "Initiate Twilio Live Call"
 SERVICE_INITIATE_CALL = "initiate_call"
+HANGUP_ALL_TIMEOUT = 10.0
 
 
 async def async_get_service(
@@ -54,21 +101,50 @@ async def async_get_service(
     discovery_info: DiscoveryInfoType | None = None,
 ) -> "TwilioCallLiveNotificationService":
     """Legacy setup."""
-    return hass.data[DOMAIN]
+    return hass.data[DATA_SERVICE]
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Get teh twilio_call_live notification service."""
-    client: Client = hass.data[TWILIO_DOMAIN]
+    client = create_async_client(
+        hass.data[TWILIO_DOMAIN],
+        pool_size=int(entry.options.get(CONF_POOL_SIZE, DEFAULT_POOL_SIZE)),
+        timeout=entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+        keepalive_timeout=entry.options.get(
+            CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT
+        ),
+    )
+    entry.async_on_unload(client.http_client.close)
+    process_pool: ProcessPoolExecutor | None = None
+    if (
+        entry.options.get(CONF_MATCH_EXECUTOR, DEFAULT_MATCH_EXECUTOR)
+        == EXECUTOR_PROCESS
+    ):
+        # A single worker, since the batches are matched one at a time.
+        process_pool = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_match_worker,
+            initargs=(
+                entry.options.get(CONF_PHRASE_EVENTS, []),
+                entry.options.get(CONF_PHONETIC_MATCHING, DEFAULT_PHONETIC_MATCHING),
+                entry.options.get(CONF_FUZZY_MATCHING, DEFAULT_FUZZY_MATCHING),
+            ),
+        )
+        entry.async_on_unload(
+            partial(process_pool.shutdown, wait=False, cancel_futures=True)
+        )
     service = TwilioCallLiveNotificationService(
         hass,
         client,
         entry,
+        process_pool,
+        hass.data[DATA_METRICS],
+        hass.data.get(DATA_TRANSCRIPT_INDEX, None),
     )
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN] = service
+    hass.data[DATA_SERVICE] = service
     async_add_entities([service])
     platform = entity_platform.async_get_current_platform()
 
@@ -95,7 +171,8 @@ async def async_setup_entry(
                 DurationSelectorConfig(enable_day=False, allow_negative=False)
             ),
         },
-        TwilioCallLiveNotificationService.initiate_call,
+        "initiate_call",
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
 
@@ -107,6 +184,9 @@ class TwilioCallLiveNotificationService(NotifyEntity, BaseNotificationService):
         hass: HomeAssistant,
         client: Client,
         config: ConfigEntry,
+        process_pool: ProcessPoolExecutor | None = None,
+        metrics: IntegrationMetrics | None = None,
+        transcript_index: TranscriptIndex | None = None,
     ) -> None:
         """Initialize notify service."""
         self._attr_name = DEFAULT_NAME
@@ -114,31 +194,117 @@ class TwilioCallLiveNotificationService(NotifyEntity, BaseNotificationService):
         self._client = client
         self._calls: dict[str, TwilioCall] = {}
         self._config = config
+        self._metrics = metrics if metrics is not None else IntegrationMetrics()
+        self._dispatcher = TwilioDataDispatcher(hass, self._metrics.profiler)
+        self._batcher = MatchBatcher(
+            hass.loop,
+            config.options.get(CONF_MATCH_EXECUTOR, DEFAULT_MATCH_EXECUTOR),
+            int(config.options.get(CONF_MATCH_QUEUE_DEPTH, DEFAULT_MATCH_QUEUE_DEPTH)),
+            process_pool,
+            phrase_index_key(
+                config.options.get(CONF_PHRASE_EVENTS, []),
+                config.options.get(CONF_PHONETIC_MATCHING, DEFAULT_PHONETIC_MATCHING),
+                config.options.get(CONF_FUZZY_MATCHING, DEFAULT_FUZZY_MATCHING),
+            ),
+            self._metrics,
+        )
+        self._hangup_scheduler = TimerWheel(hass.loop)
+        self._rate_limiter = TokenBucket(
+            config.options.get(CONF_CALLS_PER_SECOND, DEFAULT_CALLS_PER_SECOND)
+        )
+        self._max_concurrent_calls = int(
+            config.options.get(CONF_MAX_CONCURRENT_CALLS, DEFAULT_MAX_CONCURRENT_CALLS)
+        )
+        self._dial_semaphore = asyncio.Semaphore(self._max_concurrent_calls)
+        self._transcripts: TranscriptStore | None = None
+        if config.options.get(CONF_TRANSCRIPT_LOG, DEFAULT_TRANSCRIPT_LOG):
+            self._transcripts = TranscriptStore(
+                hass,
+                Path(hass.config.path(TRANSCRIPT_DIRECTORY)),
+                index=transcript_index,
+            )
 
     def call_complete(self, call: TwilioCall) -> None:
         """Call complete callback."""
         if call.call_instance is None or call.call_instance.sid is None:
             return
+        self._dispatcher.async_unregister(call.call_instance.sid)
         self._calls.pop(call.call_instance.sid, None)
 
+    @override
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._dispatcher.async_subscribe())
+
     @override
     async def async_will_remove_from_hass(self) -> None:
-        for call in self._calls.values():
-            await call.hangup()
+        self._hangup_scheduler.close()
+        await self.async_hangup_all()
+        try:
+            async with asyncio.timeout(HANGUP_ALL_TIMEOUT):
+                await self._batcher.async_drain()
+        except TimeoutError:
+            _LOGGER.warning("Phrase matching didn't finish before removal")
+        self._batcher.close()
+        if self._transcripts is not None:
+            await self._transcripts.async_close()
         return await super().async_will_remove_from_hass()
 
+    async def async_hangup_all(self, timeout: float = HANGUP_ALL_TIMEOUT) -> list[str]:
+        """Tear down every active call concurrently, within a global deadline.
+
+        At most ``max_concurrent_calls`` hangups are in flight at once. Returns
+        the SIDs of the calls Twilio didn't confirm as ended before the
+        deadline.
+        """
+        calls, self._calls = self._calls, {}
+        if not calls:
+            return []
+        semaphore = asyncio.Semaphore(self._max_concurrent_calls)
+
+        async def _async_teardown(call: TwilioCall) -> bool:
+            async with semaphore:
+                return await call.cancel_subscriptions()
+
+        tasks = {
+            sid: asyncio.create_task(_async_teardown(call))
+            for sid, call in calls.items()
+        }
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        unconfirmed = [
+            sid
+            for sid, task in tasks.items()
+            if task in pending
+            or task.cancelled()
+            or task.exception() is not None
+            or not task.result()
+        ]
+        if unconfirmed:
+            _LOGGER.warning(
+                "Couldn't confirm %d of %d calls ended: %s",
+                len(unconfirmed),
+                len(calls),
+                ", ".join(unconfirmed),
+            )
+        return unconfirmed
+
     async def initiate_call(
         self,
         message: str,
         to_number: str | list[str],
         process_live: bool = False,
-        hangup_after: timedelta | None = None,
-    ) -> None:
-        """Initiate a phone call."""
+        hangup_after: timedelta | dict[str, float] | None = None,
+    ) -> ServiceResponse:
+        """Initiate a phone call to each target, returning a result per target."""
+        requested_at = time.monotonic()
+        if isinstance(hangup_after, dict):
+            hangup_after = timedelta(**hangup_after)
         from_number = self._config.options.get(CONF_FROM_NUMBER)
         if not from_number:
             _LOGGER.warn("Twilio must be configured with a `from` number")
-            return
+            return {"calls": []}
         configs = self.hass.config_entries.async_entries(TWILIO_DOMAIN)
         if not configs:
             webhook_id = None
@@ -153,39 +319,85 @@ class TwilioCallLiveNotificationService(NotifyEntity, BaseNotificationService):
 
         if not to_number:
             _LOGGER.info("At least 1 target is required")
-            return
-
-        if message.startswith(("http://", "https://")):
-            twimlet_url = message
-        else:
-            twimlet_url = "http://twimlets.com/message?Message="
-            twimlet_url += parse_url.quote(message, safe="")
+            return {"calls": []}
 
-        for target in [to_number] if isinstance(to_number, str) else to_number:
-            try:
-                call = call = TwilioCall(
-                    self.hass,
-                    self.call_complete,
-                    self._config.options.get(CONF_PHRASE_EVENTS, []),
-                    self._client,
-                    process_live=process_live,
-                    hangup_after=hangup_after,
+        phrase_index = get_phrase_index(
+            self._config.options.get(CONF_PHRASE_EVENTS, []),
+            self._config.options.get(CONF_PHONETIC_MATCHING, DEFAULT_PHONETIC_MATCHING),
+            self._config.options.get(CONF_FUZZY_MATCHING, DEFAULT_FUZZY_MATCHING),
+        )
+        results = await asyncio.gather(
+            *[
+                self._async_dial(
+                    target,
+                    from_number,
+                    message,
+                    webhook_url,
+                    phrase_index,
+                    process_live,
+                    hangup_after,
+                    requested_at,
                 )
+                for target in ([to_number] if isinstance(to_number, str) else to_number)
+            ]
+        )
+        return {"calls": results}
 
+    async def _async_dial(
+        self,
+        target: str,
+        from_number: str,
+        message: str,
+        webhook_url: str | None,
+        phrase_index: PhraseIndex,
+        process_live: bool,
+        hangup_after: timedelta | None,
+        requested_at: float,
+    ) -> dict[str, Any]:
+        """Place a single call, isolating its failure from the other targets."""
+        async with self._dial_semaphore:
+            await self._rate_limiter.acquire()
+            call = TwilioCall(
+                self.hass,
+                self.call_complete,
+                phrase_index,
+                self._client,
+                self._dispatcher,
+                self._batcher,
+                self._hangup_scheduler,
+                self._metrics,
+                process_live=process_live,
+                hangup_after=hangup_after,
+                requested_at=requested_at,
+                transcripts=self._transcripts,
+            )
+            try:
                 sid = await call.initiate_call(
                     from_number=from_number,
                     to_number=target,
-                    url=twimlet_url,
+                    message=message,
                     webhook_url=webhook_url,
                 )
-
-                if sid is None:
-                    continue
-
-                self._calls[sid] = call
-
             except TwilioRestException as exc:
                 _LOGGER.error(exc)
+                return {
+                    ATTR_TO_NUMBER: target,
+                    ATTR_STATUS: STATUS_FAILED,
+                    "error": exc.msg,
+                }
+            except Exception as exc:
+                _LOGGER.exception("Unexpected error calling %s", target)
+                return {
+                    ATTR_TO_NUMBER: target,
+                    ATTR_STATUS: STATUS_FAILED,
+                    "error": str(exc),
+                }
+
+        if sid is None:
+            return {ATTR_TO_NUMBER: target, ATTR_STATUS: STATUS_FAILED}
+
+        self._calls[sid] = call
+        return {ATTR_TO_NUMBER: target, ATTR_STATUS: STATUS_INITIATED, "sid": sid}
 
     async def async_send_message(
         self,
@@ -0,0 +1,462 @@
+"""Compiled, read-only index of the configured phrase events."""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import json
+import math
+import re
+from typing import Any, Callable, cast
+
+import jellyfish
+import numpy as np
+
+from .config import EventPhrases, EventPhrasesList
+from .const import PHONETIC_METAPHONE, PHONETIC_NYSIIS, PHONETIC_OFF
+
+BACKREFERENCE_PATTERN = re.compile(r"\\[1-9]|\(\?P=")
+REGEX_METACHARACTERS = re.compile(r"[\\.^$*+?{}\[\]|()]")
+MAX_CACHED_INDEXES = 8
+MIN_TRIGRAM_OVERLAP = 0.3
+VECTOR_BLOCK_ROWS = 4096
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]")
+
+PHONETIC_ENCODERS: dict[str, Callable[[str], str]] = {
+    PHONETIC_METAPHONE: jellyfish.metaphone,
+    PHONETIC_NYSIIS: jellyfish.nysiis,
+}
+
+_INDEX_CACHE: dict[str, "PhraseIndex"] = {}
+
+
+@dataclass(frozen=True)
+class LiteralPhrase:
+    """A phrase without regex syntax, which can also be matched fuzzily."""
+
+    event_index: int
+    text: str
+    size: int
+    fuzzy: bool
+
+
+class TrigramVectors:
+    """Trigram posting lists of literals, laid out as arrays.
+
+    Trigram keys pack the three code points into one integer and are kept
+    sorted, each with the slice of ``postings`` holding its literal columns.
+    """
+
+    def __init__(
+        self, postings: dict[str, list[int]], required_overlap: list[int]
+    ) -> None:
+        """Initialize the arrays from the trigram postings of the literals."""
+        self.literal_ids = np.array(
+            sorted({literal_id for ids in postings.values() for literal_id in ids})
+        )
+        columns = {
+            int(literal_id): column
+            for column, literal_id in enumerate(self.literal_ids)
+        }
+        trigrams = sorted(postings, key=_trigram_key)
+        self.keys = np.array([_trigram_key(trigram) for trigram in trigrams])
+        self.starts = np.cumsum([0] + [len(postings[trigram]) for trigram in trigrams])
+        self.postings = np.array(
+            [
+                columns[literal_id]
+                for trigram in trigrams
+                for literal_id in postings[trigram]
+            ]
+        )
+        self.required = np.array(
+            [required_overlap[literal_id] for literal_id in self.literal_ids]
+        )
+
+    def overlap(self, windows: list[str]) -> np.ndarray:
+        """Count the distinct trigrams each window shares with each literal."""
+        padded = [f" {window} " for window in windows]
+        lengths = np.array([len(text) for text in padded])
+        codes = np.frombuffer(
+            "".join(padded).encode("utf-32-le"), dtype=np.uint32
+        ).astype(np.int64)
+        # Trigram i starts at code i; only those inside a single window count.
+        window_of_code = np.repeat(np.arange(len(windows)), lengths)
+        position = np.arange(len(codes)) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        valid = (position < np.repeat(lengths - 2, lengths))[:-2]
+        keys = (codes[:-2] << 42 | codes[1:-1] << 21 | codes[2:])[valid]
+        owners = window_of_code[:-2][valid]
+
+        rows = np.searchsorted(self.keys, keys)
+        rows[rows == len(self.keys)] = 0
+        found = self.keys[rows] == keys
+        pairs = np.unique(owners[found] * len(self.keys) + rows[found])
+        owners, rows = np.divmod(pairs, len(self.keys))
+
+        counts = self.starts[rows + 1] - self.starts[rows]
+        first = np.repeat(self.starts[rows] - (np.cumsum(counts) - counts), counts)
+        columns = self.postings[first + np.arange(counts.sum())]
+        return np.bincount(
+            np.repeat(owners, counts) * len(self.literal_ids) + columns,
+            minlength=len(windows) * len(self.literal_ids),
+        ).reshape(len(windows), len(self.literal_ids))
+
+
+class PhraseIndex:
+    """Phrase events compiled once and shared by every call.
+
+    The index is never mutated after it is built. Calls keep track of the
+    events they already fired in their own bitset and pass it to ``match``.
+    """
+
+    def __init__(
+        self,
+        event_phrases: EventPhrasesList,
+        key: str = "",
+        phonetic: str = PHONETIC_OFF,
+        fuzzy: bool = False,
+    ) -> None:
+        """Initialize the index."""
+        self.key = key
+        self.phonetic = phonetic
+        self.fuzzy = fuzzy
+        self.event_phrases: tuple[EventPhrases, ...] = tuple(event_phrases)
+        self._positions = {
+            id(event): idx for idx, event in enumerate(self.event_phrases)
+        }
+        self._compile()
+
+    def _compile(self) -> None:
+        """Combine the regex phrases of every event into a single pattern.
+
+        Each phrase becomes a named group inside one lookahead alternation, so a
+        single ``finditer`` pass over the transcript finds every position where
+        an event matches. Alternatives are ordered by event, so the first event
+        matching at a position is reported and only the events after it are
+        tried there individually. Phrases that can't be
+        combined (back-references) are checked individually. Phrases without
+        regex syntax, and plain strings, are kept as literals for the phonetic
+        and fuzzy matching; the configured ones are matched exactly by a prefix
+        trie. Configured literals are only matched fuzzily when ``fuzzy`` is
+        set, plain strings always are.
+        """
+        self.pattern: re.Pattern | None = None
+        self._group_events: dict[str, int] = {}
+        self._event_patterns: list[re.Pattern | None] = []
+        self.uncompiled: list[tuple[int, re.Pattern]] = []
+        self.literals: list[LiteralPhrase] = []
+        exact_literals: dict[str, set[int]] = {}
+        alternatives: list[str] = []
+        event_alternatives: list[list[str]] = []
+        for event_index, event in enumerate(self.event_phrases):
+            event_alternatives.append([])
+            for phrase in event.phrases:
+                pattern = phrase.pattern if isinstance(phrase, re.Pattern) else phrase
+                if isinstance(phrase, str) or not REGEX_METACHARACTERS.search(pattern):
+                    text = " ".join(pattern.lower().split())
+                    if text:
+                        self.literals.append(
+                            LiteralPhrase(
+                                event_index,
+                                text,
+                                text.count(" ") + 1,
+                                self.fuzzy or isinstance(phrase, str),
+                            )
+                        )
+                    if isinstance(phrase, re.Pattern) and pattern:
+                        exact_literals.setdefault(pattern.lower(), set()).add(
+                            event_index
+                        )
+                elif not BACKREFERENCE_PATTERN.search(pattern):
+                    group = f"e{event_index}_{len(alternatives)}"
+                    self._group_events[group] = event_index
+                    alternatives.append(f"(?P<{group}>{pattern})")
+                    event_alternatives[-1].append(f"(?:{pattern})")
+                else:
+                    self.uncompiled.append((event_index, cast(re.Pattern, phrase)))
+        self.max_literal_size = max(
+            (literal.size for literal in self.literals), default=0
+        )
+        self._index_literals()
+        self._compile_exact_literals(exact_literals)
+        if not alternatives:
+            return
+        try:
+            self.pattern = re.compile(
+                "(?=" + "|".join(alternatives) + ")", re.IGNORECASE
+            )
+            self._event_patterns = [
+                re.compile("|".join(patterns), re.IGNORECASE) if patterns else None
+                for patterns in event_alternatives
+            ]
+        except re.error:
+            self.pattern = None
+            self._group_events = {}
+            self.uncompiled = [
+                (event_index, re.compile(pattern[3:-1], re.IGNORECASE))
+                for event_index, patterns in enumerate(event_alternatives)
+                for pattern in patterns
+            ] + self.uncompiled
+
+    def _compile_exact_literals(self, exact_literals: dict[str, set[int]]) -> None:
+        """Compile the literal phrases into one prefix trie pattern.
+
+        A flat alternation makes the regex engine try every literal at every
+        position. The trie only follows the branch matching the next character
+        and greedily returns the longest literal; the events of the literals
+        that are prefixes of it are merged in, so no literal is shadowed.
+        """
+        self.literal_pattern: re.Pattern | None = None
+        self._literal_events: dict[str, list[int]] = {}
+        if not exact_literals:
+            return
+        trie: dict[str, dict] = {}
+        for literal in exact_literals:
+            node = trie
+            for char in literal:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        for literal in exact_literals:
+            events: set[int] = set()
+            for end in range(1, len(literal) + 1):
+                if literal[:end] in exact_literals:
+                    events |= exact_literals[literal[:end]]
+            self._literal_events[literal] = sorted(events)
+        self.literal_pattern = re.compile(f"(?=({_trie_pattern(trie)}))", re.IGNORECASE)
+
+    def _index_literals(self) -> None:
+        """Build a trigram inverted index of the fuzzy literals, per token count."""
+        self._trigram_postings: dict[int, dict[str, list[int]]] = {}
+        self._required_overlap: list[int] = []
+        for literal_id, literal in enumerate(self.literals):
+            trigrams = trigrams_of(literal.text)
+            self._required_overlap.append(
+                max(1, math.ceil(len(trigrams) * MIN_TRIGRAM_OVERLAP))
+            )
+            if not literal.fuzzy:
+                continue
+            postings = self._trigram_postings.setdefault(literal.size, {})
+            for trigram in trigrams:
+                postings.setdefault(trigram, []).append(literal_id)
+        self.literal_sizes = sorted(self._trigram_postings)
+        self._literal_vectors: dict[int, TrigramVectors] = {}
+
+        self._phonetic_postings: dict[int, dict[str, list[int]]] = {}
+        if self.phonetic != PHONETIC_OFF:
+            for literal in self.literals:
+                code = " ".join(
+                    phonetic_code(token, self.phonetic)
+                    for token in literal.text.split()
+                )
+                postings = self._phonetic_postings.setdefault(literal.size, {})
+                events = postings.setdefault(code, [])
+                if literal.event_index not in events:
+                    events.append(literal.event_index)
+        self.phonetic_sizes = sorted(self._phonetic_postings)
+
+    def phonetic_matches(self, codes: list[str]) -> list[int]:
+        """Get the events of the literals that sound like the encoded tokens."""
+        postings = self._phonetic_postings.get(len(codes), None)
+        if postings is None:
+            return []
+        return postings.get(" ".join(codes), [])
+
+    def fuzzy_candidates(self, window: str, size: int) -> list[int]:
+        """Get the literals of a token count sharing enough trigrams with window.
+
+        Only the posting lists of the window's trigrams are visited, so the
+        cost depends on how many literals look alike, not on the catalog size.
+        """
+        postings = self._trigram_postings.get(size, None)
+        if postings is None:
+            return []
+        overlap: dict[int, int] = {}
+        for trigram in trigrams_of(window):
+            for literal_id in postings.get(trigram, ()):
+                overlap[literal_id] = overlap.get(literal_id, 0) + 1
+        return [
+            literal_id
+            for literal_id, count in overlap.items()
+            if count >= self._required_overlap[literal_id]
+        ]
+
+    def batch_fuzzy_candidates(self, windows: list[tuple[str, int]]) -> list[list[int]]:
+        """Get the fuzzy candidates of many (window, token count) pairs at once.
+
+        The windows of a token count are concatenated into one array of code
+        points, from which every trigram key is computed and looked up in the
+        sorted trigram keys of the literals without a Python loop. The overlap
+        with every literal is then counted over the posting lists, giving the
+        same candidates as ``fuzzy_candidates``.
+        """
+        candidates: list[list[int]] = [[] for _ in windows]
+        rows_by_size: dict[int, list[int]] = {}
+        for row, (_, size) in enumerate(windows):
+            if size in self._trigram_postings:
+                rows_by_size.setdefault(size, []).append(row)
+        for size, rows in rows_by_size.items():
+            vectors = self._size_vectors(size)
+            for start in range(0, len(rows), VECTOR_BLOCK_ROWS):
+                block = rows[start : start + VECTOR_BLOCK_ROWS]
+                overlap = vectors.overlap([windows[row][0] for row in block])
+                for block_row, column in zip(*np.nonzero(overlap >= vectors.required)):
+                    candidates[block[block_row]].append(
+                        int(vectors.literal_ids[column])
+                    )
+        return candidates
+
+    def _size_vectors(self, size: int) -> "TrigramVectors":
+        """Get the vectorized trigram postings of the literals of a token count."""
+        vectors = self._literal_vectors.get(size, None)
+        if vectors is None:
+            vectors = self._literal_vectors[size] = TrigramVectors(
+                self._trigram_postings[size], self._required_overlap
+            )
+        return vectors
+
+    def __len__(self) -> int:
+        """Get the number of events."""
+        return len(self.event_phrases)
+
+    def index_of(self, event: EventPhrases) -> int:
+        """Get the position of an event of this index."""
+        return self._positions[id(event)]
+
+    def match(
+        self, transcript: str, fired: int = 0, boundary: int | None = None
+    ) -> list[int]:
+        """Get the positions of the unfired events matching the transcript.
+
+        With ``boundary``, only the matches crossing the separator at that
+        position count, so carried text can be joined to a new transcript to
+        match the phrases spanning both without matching either on its own.
+        """
+        matched: set[int] = set()
+        if self.literal_pattern is not None:
+            for match in self.literal_pattern.finditer(transcript):
+                if boundary is not None:
+                    if match.start(1) >= boundary:
+                        break
+                    if not crosses_boundary(match.start(1), match.end(1), boundary):
+                        continue
+                for event_index in self._literal_events[match.group(1).lower()]:
+                    if not fired >> event_index & 1:
+                        matched.add(event_index)
+        if self.pattern is None:
+            return sorted(matched)
+        for match in self.pattern.finditer(transcript):
+            if boundary is not None and match.start() >= boundary:
+                break
+            group = cast(str, match.lastgroup)
+            event_index = self._group_events[group]
+            if not fired >> event_index & 1 and (
+                boundary is None
+                or crosses_boundary(match.start(), match.end(group), boundary)
+            ):
+                matched.add(event_index)
+            self._match_shadowed_at(
+                transcript, match.start(), event_index, fired, boundary, matched
+            )
+        return sorted(matched)
+
+    def _match_shadowed_at(
+        self,
+        transcript: str,
+        pos: int,
+        after: int,
+        fired: int,
+        boundary: int | None,
+        matched: set[int],
+    ) -> None:
+        """Add the unfired events after ``after`` that also match at a position.
+
+        The alternation only reports the first event matching at a position,
+        so the events after it are tried there one by one.
+        """
+        for event_index in range(after + 1, len(self._event_patterns)):
+            pattern = self._event_patterns[event_index]
+            if pattern is None or event_index in matched or fired >> event_index & 1:
+                continue
+            match = pattern.match(transcript, pos)
+            if match is not None and (
+                boundary is None or crosses_boundary(pos, match.end(), boundary)
+            ):
+                matched.add(event_index)
+
+
+def crosses_boundary(start: int, end: int, boundary: int) -> bool:
+    """Check whether a match spans the separator at the boundary position."""
+    return start < boundary < end - 1
+
+
+def _trie_pattern(node: dict[str, dict]) -> str:
+    """Render a character trie as a regex, longest match first."""
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return f"(?:{body})?"
+    return body
+
+
+def _trigram_key(trigram: str) -> int:
+    """Pack the three code points of a trigram into one integer."""
+    return ord(trigram[0]) << 42 | ord(trigram[1]) << 21 | ord(trigram[2])
+
+
+def trigrams_of(text: str) -> set[str]:
+    """Get the character trigrams of the text, padded with spaces."""
+    padded = f" {text} "
+    return {padded[idx : idx + 3] for idx in range(len(padded) - 2)}
+
+
+@lru_cache(maxsize=8192)
+def phonetic_code(token: str, phonetic: str) -> str:
+    """Encode a single token with the phonetic algorithm."""
+    clean_token = NON_ALPHANUMERIC.sub("", token.lower())
+    if not clean_token:
+        return ""
+    return PHONETIC_ENCODERS[phonetic](clean_token)
+
+
+def phrase_index_key(
+    phrase_events: list[dict[str, Any]],
+    phonetic: str = PHONETIC_OFF,
+    fuzzy: bool = False,
+) -> str:
+    """Hash the phrase events options."""
+    return hashlib.sha1(
+        json.dumps([phrase_events, phonetic, fuzzy], sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def get_phrase_index(
+    phrase_events: list[dict[str, Any]],
+    phonetic: str = PHONETIC_OFF,
+    fuzzy: bool = False,
+) -> PhraseIndex:
+    """Get the cached index for the phrase events options, building it if needed."""
+    key = phrase_index_key(phrase_events, phonetic, fuzzy)
+    index = _INDEX_CACHE.get(key, None)
+    if index is None:
+        if len(_INDEX_CACHE) >= MAX_CACHED_INDEXES:
+            _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)))
+        index = _INDEX_CACHE[key] = PhraseIndex(
+            EventPhrasesList(phrase_events), key, phonetic, fuzzy
+        )
+    return index
+
+
+def cached_phrase_index(key: str) -> PhraseIndex | None:
+    """Get the cached index with the given key, if it was built in this process."""
+    return _INDEX_CACHE.get(key, None)
+
+
+def invalidate_phrase_index_cache() -> None:
+    """Drop every cached index."""
+    _INDEX_CACHE.clear()
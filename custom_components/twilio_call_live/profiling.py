@@ -0,0 +1,152 @@
+"""Opt-in profiling of the transcription pipeline."""
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from typing import Any, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DURATION = 60.0
+MAX_PROFILE_DURATION = 600.0
+REPORT_STATS_LINES = 40
+
+
+class SpanStats:
+    """Time spent in one stage of the pipeline."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize the stats."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float) -> None:
+        """Count a span."""
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the stats for the diagnostics."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+        }
+
+
+class Profiler:
+    """Times the pipeline stages and samples cProfile stacks for a window.
+
+    The pipeline checks ``enabled`` and, while on, records the time a stage
+    took since its ``time.perf_counter()`` start. While off, the pipeline pays
+    for that attribute check and nothing else. While on, cProfile also records
+    every call made on the event loop thread. Phrase matching in a thread or process
+    executor is only timed, its stacks aren't sampled. The window ends after
+    its duration, or when stopped, and leaves a plain text report in
+    ``report``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self.enabled = False
+        self.spans: dict[str, SpanStats] = {}
+        self.report: str | None = None
+        self._profile: cProfile.Profile | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._started_at = 0.0
+        self._on_report: Callable[[str], None] | None = None
+
+    def record(self, stage: str, start: float) -> None:
+        """Record a stage of the pipeline that started at ``start``."""
+        duration = time.perf_counter() - start
+        stats = self.spans.get(stage, None)
+        if stats is None:
+            stats = self.spans[stage] = SpanStats()
+        stats.add(duration)
+
+    def start(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        duration: float = DEFAULT_PROFILE_DURATION,
+        on_report: Callable[[str], None] | None = None,
+    ) -> None:
+        """Start a profiling window, restarting the current one if any.
+
+        ``on_report`` is called with the report when the window ends on its own.
+        """
+        self.stop()
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Another profiler, like Home Assistant's own, is running.
+            _LOGGER.warning("Another profiler is running, only timing the stages")
+            self._profile = None
+        self.spans = {}
+        self.enabled = True
+        self._started_at = time.monotonic()
+        self._on_report = on_report
+        self._timer = loop.call_later(
+            min(duration, MAX_PROFILE_DURATION), self._on_window_end
+        )
+
+    def stop(self) -> str | None:
+        """End the profiling window, returning its report, if one was running."""
+        if not self.enabled:
+            return None
+        if self._profile is not None:
+            self._profile.disable()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.enabled = False
+        self.report = self._build_report(time.monotonic() - self._started_at)
+        self._profile = None
+        return self.report
+
+    def _on_window_end(self) -> None:
+        """Stop at the end of the window and hand over the report."""
+        self._timer = None
+        report = self.stop()
+        if report is not None and self._on_report is not None:
+            self._on_report(report)
+
+    def _build_report(self, elapsed: float) -> str:
+        """Render the stage timings and the busiest functions as text."""
+        out = io.StringIO()
+        out.write(f"twilio_call_live profile, {elapsed:.1f}s\n\n")
+        out.write(
+            f"{'stage':<12} {'count':>8} {'total ms':>10} {'mean us':>10} "
+            f"{'max us':>10}\n"
+        )
+        for stage, stats in sorted(
+            self.spans.items(), key=lambda item: item[1].total, reverse=True
+        ):
+            out.write(
+                f"{stage:<12} {stats.count:>8} {stats.total * 1e3:>10.1f} "
+                f"{stats.total / stats.count * 1e6:>10.1f} {stats.max * 1e6:>10.1f}\n"
+            )
+        if self._profile is not None:
+            out.write("\n")
+            profile_stats = pstats.Stats(self._profile, stream=out)
+            profile_stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+                REPORT_STATS_LINES
+            )
+        return out.getvalue()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the stage timings and the last report for the diagnostics."""
+        return {
+            "enabled": self.enabled,
+            "spans": {stage: stats.as_dict() for stage, stats in self.spans.items()},
+            "report": self.report,
+        }
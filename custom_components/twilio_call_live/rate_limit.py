@@ -0,0 +1,38 @@
+"""Rate limiting for Twilio REST requests."""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Token bucket limiting how many operations start per second."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Initialize the bucket, starting full."""
+        if rate <= 0:
+            raise ValueError(rate)
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it.
+
+        Waiters are served in the order they arrived.
+        """
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
@@ -0,0 +1,118 @@
+"""Hashed timer wheel for the deadlines of many calls."""
+
+import asyncio
+import logging
+import math
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RESOLUTION = 1.0
+DEFAULT_SLOTS = 512
+
+
+class WheelTimer:
+    """A callback armed on a timer wheel."""
+
+    __slots__ = ("_wheel", "slot", "rounds", "callback")
+
+    def __init__(
+        self,
+        wheel: "TimerWheel",
+        slot: int,
+        rounds: int,
+        callback: Callable[[], None],
+    ) -> None:
+        """Initialize the timer."""
+        self._wheel = wheel
+        self.slot = slot
+        self.rounds = rounds
+        self.callback = callback
+
+    def cancel(self) -> None:
+        """Disarm the timer; does nothing if it already fired or was cancelled."""
+        self._wheel._cancel(self)
+
+
+class TimerWheel:
+    """Timer wheel running any number of deadlines off a single loop timer.
+
+    Time is cut into ticks of ``resolution`` seconds, hashed onto ``slots``
+    buckets. Arming and cancelling a timer is a set insert or removal, and the
+    loop only ever has the next tick scheduled, which is dropped while no
+    timer is armed. Timers fire at most one tick late, never early.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        resolution: float = DEFAULT_RESOLUTION,
+        slots: int = DEFAULT_SLOTS,
+    ) -> None:
+        """Initialize the wheel."""
+        self._loop = loop
+        self.resolution = resolution
+        self._slots: list[set[WheelTimer]] = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._next_tick = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+        self._armed = 0
+
+    def __len__(self) -> int:
+        """Get the number of armed timers."""
+        return self._armed
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> WheelTimer:
+        """Call the callback on the loop after delay seconds."""
+        now = self._loop.time()
+        if self._handle is None:
+            self._next_tick = now + self.resolution
+            self._handle = self._loop.call_at(self._next_tick, self._on_tick)
+        ticks = max(0, math.ceil((now + delay - self._next_tick) / self.resolution))
+        rounds, offset = divmod(ticks, len(self._slots))
+        timer = WheelTimer(
+            self, (self._cursor + offset) % len(self._slots), rounds, callback
+        )
+        self._slots[timer.slot].add(timer)
+        self._armed += 1
+        return timer
+
+    def close(self) -> None:
+        """Disarm every timer."""
+        for slot in self._slots:
+            slot.clear()
+        self._armed = 0
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _cancel(self, timer: WheelTimer) -> None:
+        """Remove a timer from its slot."""
+        slot = self._slots[timer.slot]
+        if timer in slot:
+            slot.remove(timer)
+            self._armed -= 1
+
+    def _on_tick(self) -> None:
+        """Fire the due timers of every tick that elapsed."""
+        now = self._loop.time()
+        while self._next_tick <= now:
+            slot = self._slots[self._cursor]
+            due = [timer for timer in slot if timer.rounds == 0]
+            for timer in slot:
+                timer.rounds -= 1
+            slot.difference_update(due)
+            self._armed -= len(due)
+            # Move on first, so timers armed by the callbacks land in the
+            # slots ahead.
+            self._cursor = (self._cursor + 1) % len(self._slots)
+            self._next_tick += self.resolution
+            for timer in due:
+                try:
+                    timer.callback()
+                except Exception:
+                    _LOGGER.exception("Error running timer callback")
+        if self._armed:
+            self._handle = self._loop.call_at(self._next_tick, self._on_tick)
+        else:
+            self._handle = None
@@ -0,0 +1,65 @@
+"""Bounded queue of the transcription segments received for a call."""
+
+import asyncio
+from collections import deque
+
+from .webhook import WebhookPayload
+
+MAX_QUEUED_SEGMENTS = 32
+
+
+class SegmentQueue:
+    """Queue of undecoded transcription segments, consumed by a single task.
+
+    Twilio sends partial results as revisions of the current utterance, so a
+    partial followed by any other segment is superseded by it. When the queue
+    is full, those superseded partials are dropped; final segments are always
+    kept. A call therefore never holds more than its unconsumed final
+    segments plus the newest partial.
+    """
+
+    def __init__(self, maxsize: int = MAX_QUEUED_SEGMENTS) -> None:
+        """Initialize the queue."""
+        self.maxsize = maxsize
+        self.coalesced = 0
+        self._items: deque[WebhookPayload] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def __len__(self) -> int:
+        """Get the number of queued segments."""
+        return len(self._items)
+
+    def put_nowait(self, payload: WebhookPayload) -> None:
+        """Queue a segment, coalescing superseded partials if the queue is full."""
+        if self._closed:
+            return
+        self._items.append(payload)
+        if len(self._items) > self.maxsize:
+            self._coalesce()
+        self._ready.set()
+
+    def _coalesce(self) -> None:
+        """Drop every partial followed by a newer segment."""
+        last = len(self._items) - 1
+        kept = deque(
+            payload
+            for idx, payload in enumerate(self._items)
+            if payload.final or idx == last
+        )
+        self.coalesced += len(self._items) - len(kept)
+        self._items = kept
+
+    async def get(self) -> WebhookPayload | None:
+        """Wait for the oldest segment, or None once closed and drained."""
+        while not self._items:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+    def close(self) -> None:
+        """Stop accepting segments; the consumer drains the rest."""
+        self._closed = True
+        self._ready.set()
@@ -0,0 +1,171 @@
+"""Diagnostic sensors for the twilio_call_live metrics."""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DATA_METRICS
+from .metrics import Histogram, IntegrationMetrics
+
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+@dataclass(frozen=True, kw_only=True)
+class HistogramSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reporting a histogram of the metrics."""
+
+    histogram: Callable[[IntegrationMetrics], Histogram]
+    scale: float = 1.0
+
+
+def _latency_sensor(
+    key: str, name: str, histogram: Callable[[IntegrationMetrics], Histogram]
+) -> HistogramSensorEntityDescription:
+    """Describe a sensor reporting a latency histogram in milliseconds."""
+    return HistogramSensorEntityDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=1,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        histogram=histogram,
+        scale=1000.0,
+    )
+
+
+HISTOGRAM_SENSORS = (
+    _latency_sensor(
+        "call_setup_latency",
+        "Twilio call setup latency",
+        lambda metrics: metrics.call_setup,
+    ),
+    _latency_sensor(
+        "first_transcript_latency",
+        "Twilio first transcript latency",
+        lambda metrics: metrics.first_transcript,
+    ),
+    _latency_sensor(
+        "webhook_latency",
+        "Twilio webhook processing time",
+        lambda metrics: metrics.webhook,
+    ),
+    _latency_sensor(
+        "merge_latency",
+        "Twilio transcript merge time",
+        lambda metrics: metrics.merge,
+    ),
+    _latency_sensor(
+        "flush_latency",
+        "Twilio transcript flush latency",
+        lambda metrics: metrics.flush,
+    ),
+    _latency_sensor(
+        "match_latency",
+        "Twilio phrase match time",
+        lambda metrics: metrics.match,
+    ),
+    HistogramSensorEntityDescription(
+        key="queue_depth",
+        name="Twilio segment queue depth",
+        native_unit_of_measurement="segments",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        histogram=lambda metrics: metrics.queue_depth,
+    ),
+)
+EVENTS_FIRED_SENSOR = SensorEntityDescription(
+    key="events_fired",
+    name="Twilio phrase events fired",
+    native_unit_of_measurement="events/min",
+    state_class=SensorStateClass.MEASUREMENT,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the metrics sensors."""
+    metrics: IntegrationMetrics = hass.data[DATA_METRICS]
+    async_add_entities(
+        [
+            *[
+                HistogramSensor(entry, metrics, description)
+                for description in HISTOGRAM_SENSORS
+            ],
+            EventsFiredSensor(entry, metrics, EVENTS_FIRED_SENSOR),
+        ]
+    )
+
+
+class MetricSensor(SensorEntity):
+    """Sensor reporting one of the metrics."""
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        metrics: IntegrationMetrics,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._metrics = metrics
+
+
+class HistogramSensor(MetricSensor):
+    """95th percentile of a histogram, over the values since the last update.
+
+    Each update only looks at what was observed since the previous one, so a
+    regression shows up within a scan interval instead of being averaged into
+    everything since Home Assistant started. The state is unknown when nothing
+    was observed.
+    """
+
+    entity_description: HistogramSensorEntityDescription
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        metrics: IntegrationMetrics,
+        description: HistogramSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(entry, metrics, description)
+        self._histogram = description.histogram(metrics)
+        self._last_counts = list(self._histogram.counts)
+
+    async def async_update(self) -> None:
+        """Compute the percentiles of the values observed since the last update."""
+        counts = list(self._histogram.counts)
+        window = [count - last for count, last in zip(counts, self._last_counts)]
+        self._last_counts = counts
+        scale = self.entity_description.scale
+        attributes: dict[str, Any] = {"count": sum(window)}
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            value = self._histogram.quantile(q, window)
+            attributes[name] = None if value is None else round(value * scale, 3)
+        self._attr_native_value = attributes["p95"]
+        self._attr_extra_state_attributes = attributes
+
+
+class EventsFiredSensor(MetricSensor):
+    """Phrase events fired during the last minute."""
+
+    async def async_update(self) -> None:
+        """Count the events fired during the last minute."""
+        self._attr_native_value = self._metrics.events_fired.per_minute()
+        self._attr_extra_state_attributes = {"total": self._metrics.events_fired.count}
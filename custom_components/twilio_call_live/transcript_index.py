@@ -0,0 +1,100 @@
+"""Full-text index of the logged call transcripts."""
+
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Any
+
+TRANSCRIPT_INDEX_FILE = "index.db"
+SNIPPET_TOKENS = 12
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 500
+
+
+def phrase_query(text: str) -> str:
+    """Quote text as an FTS5 phrase, so it is never parsed as query syntax."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class TranscriptIndex:
+    """SQLite FTS5 index of the transcripts, kept next to the transcript log.
+
+    Every method blocks on SQLite, so they are meant for the executor. The
+    connection is opened on first use and shared by the executor threads,
+    one at a time.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the index."""
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index, creating it if needed."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5("
+                "transcript, call_sid UNINDEXED, time UNINDEXED)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def add(self, records: list[tuple[float, str, str]]) -> None:
+        """Index a batch of (time, call_sid, transcript) records."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO transcripts (time, call_sid, transcript) "
+                    "VALUES (?, ?, ?)",
+                    records,
+                )
+
+    def search(
+        self,
+        text: str,
+        since: float | None = None,
+        until: float | None = None,
+        call_sid: str | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[dict[str, Any]]:
+        """Find the transcripts containing the phrase, newest first."""
+        conditions = ["transcripts MATCH ?"]
+        params: list[Any] = [phrase_query(text)]
+        if since is not None:
+            conditions.append("time >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("time < ?")
+            params.append(until)
+        if call_sid is not None:
+            conditions.append("call_sid = ?")
+            params.append(call_sid)
+        params.append(limit)
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT call_sid, time, "
+                    f"snippet(transcripts, 0, '[', ']', '…', {SNIPPET_TOKENS}) "
+                    f"FROM transcripts WHERE {' AND '.join(conditions)} "
+                    "ORDER BY time DESC LIMIT ?",
+                    params,
+                )
+                .fetchall()
+            )
+        return [
+            {"call_sid": call_sid, "time": time, "snippet": snippet}
+            for call_sid, time, snippet in rows
+        ]
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
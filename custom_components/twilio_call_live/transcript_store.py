@@ -0,0 +1,197 @@
+"""Append-only log of the transcripts of live calls."""
+
+import asyncio
+from datetime import UTC, datetime
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+import re
+import sqlite3
+import time
+from typing import Any, Callable, Iterator
+
+from homeassistant.core import HomeAssistant
+
+from .transcript_index import TranscriptIndex
+
+try:
+    import orjson
+
+    _dumps: Callable[[Any], bytes] = orjson.dumps
+    _loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+_LOGGER = logging.getLogger(__name__)
+
+TRANSCRIPT_DIRECTORY = "twilio_call_live_transcripts"
+MAX_TRANSCRIPT_FILE_BYTES = 16 * 1024 * 1024
+TRANSCRIPT_FLUSH_INTERVAL = 1.0
+MAX_PENDING_RECORDS = 256
+
+_PART_PATTERN = re.compile(
+    r"^transcripts-(?P<day>\d{4}-\d{2}-\d{2})\.(?P<part>\d+)\.jsonl$"
+)
+
+
+def transcript_file(directory: Path, day: str, part: int = 0) -> Path:
+    """Get the file a day's transcripts are appended to, or one of its parts."""
+    if not part:
+        return directory / f"transcripts-{day}.jsonl"
+    return directory / f"transcripts-{day}.{part}.jsonl"
+
+
+def transcript_files(directory: Path, day: str) -> list[Path]:
+    """Get the files holding a day's transcripts, oldest first.
+
+    Once the file being appended to is full, it is renamed to the next part
+    number, so the numbered parts come first and the unnumbered file last.
+    """
+    parts = sorted(
+        (int(match["part"]), path)
+        for path in directory.glob(f"transcripts-{day}.*.jsonl")
+        if (match := _PART_PATTERN.match(path.name)) is not None
+    )
+    files = [path for _, path in parts]
+    current = transcript_file(directory, day)
+    if current.exists():
+        files.append(current)
+    return files
+
+
+def read_transcripts(
+    path: Path, call_sid: str | None = None
+) -> Iterator[dict[str, Any]]:
+    """Read the records of a transcript file through a memory map.
+
+    With ``call_sid``, lines not mentioning the call are skipped before they
+    are decoded. A line cut short by an interrupted write is skipped too.
+    """
+    needle = _dumps(call_sid) if call_sid is not None else None
+    with path.open("rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while (end := mapped.find(b"\n", start)) != -1:
+                line = mapped[start:end]
+                start = end + 1
+                if needle is not None and needle not in line:
+                    continue
+                try:
+                    record = _loads(line)
+                except ValueError:
+                    continue
+                if call_sid is None or record.get("call_sid", None) == call_sid:
+                    yield record
+
+
+def _write_records(
+    directory: Path, max_bytes: int, records: list[tuple[float, str, str]]
+) -> None:
+    """Append records to the file of their day, rotating full files."""
+    directory.mkdir(parents=True, exist_ok=True)
+    days: dict[str, list[bytes]] = {}
+    for now, call_sid, transcript in records:
+        day = datetime.fromtimestamp(now, UTC).strftime("%Y-%m-%d")
+        line = _dumps({"time": now, "call_sid": call_sid, "transcript": transcript})
+        days.setdefault(day, []).append(line + b"\n")
+    for day, lines in days.items():
+        data = b"".join(lines)
+        path = transcript_file(directory, day)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(data) > max_bytes:
+            part = len(transcript_files(directory, day))
+            while transcript_file(directory, day, part).exists():
+                part += 1
+            path.rename(transcript_file(directory, day, part))
+        with path.open("ab") as file:
+            file.write(data)
+
+
+class TranscriptStore:
+    """Appends the transcripts of live calls to a log, one file per UTC day.
+
+    Each record is a line of compact JSON with the time, the CallSid and a
+    finalized utterance of the call. Records are buffered on the event loop and
+    written in batches by the executor, at most ``flush_interval`` after the
+    first one, or once ``MAX_PENDING_RECORDS`` are buffered. A single batch is
+    written at a time. A file is rotated before a batch would grow it past
+    ``max_bytes``; batches aren't split, so a file holds at least one. Each
+    batch is also added to ``index``, if given, in the same executor job.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        directory: Path,
+        max_bytes: int = MAX_TRANSCRIPT_FILE_BYTES,
+        flush_interval: float = TRANSCRIPT_FLUSH_INTERVAL,
+        index: TranscriptIndex | None = None,
+    ) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.directory = directory
+        self.index = index
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._pending: list[tuple[float, str, str]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+
+    def append(self, call_sid: str, transcript: str) -> None:
+        """Queue an utterance of a call to be written."""
+        self._pending.append((round(time.time(), 3), call_sid, transcript))
+        if len(self._pending) >= MAX_PENDING_RECORDS:
+            self._flush()
+        elif self._timer is None and self._task is None:
+            self._timer = self.hass.loop.call_later(self.flush_interval, self._flush)
+
+    def _flush(self) -> None:
+        """Write the queued records, unless a batch is being written."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending or self._task is not None:
+            return
+        records, self._pending = self._pending, []
+        self._task = self.hass.async_create_background_task(
+            self._async_write(records), "twilio_call_live transcripts"
+        )
+
+    async def _async_write(self, records: list[tuple[float, str, str]]) -> None:
+        """Write a batch in the executor."""
+        try:
+            await self.hass.async_add_executor_job(self._write_batch, records)
+        finally:
+            self._task = None
+            # Records queued during the write waited long enough already.
+            self._flush()
+
+    def _write_batch(self, records: list[tuple[float, str, str]]) -> None:
+        """Write a batch to the log, then add it to the index."""
+        try:
+            _write_records(self.directory, self.max_bytes, records)
+        except OSError:
+            _LOGGER.exception("Couldn't write %d transcripts", len(records))
+        if self.index is None:
+            return
+        try:
+            self.index.add(records)
+        except sqlite3.Error:
+            _LOGGER.exception("Couldn't index %d transcripts", len(records))
+
+    async def async_close(self) -> None:
+        """Write everything queued."""
+        self._flush()
+        while self._task is not None:
+            await self._task
@@ -1,84 +1,350 @@
 """Transcription merging tool."""
 
-from datetime import datetime, UTC, timedelta
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+import logging
 import re
-from typing import Callable
+import time
+from typing import Any, Callable, Iterator
 import jellyfish
 
-from .config import EventPhrases, EventPhrasesList
+from .config import EventPhrases
+from .const import EXECUTOR_LOOP
+from .metrics import IntegrationMetrics
+from .phrase_index import (
+    PhraseIndex,
+    cached_phrase_index,
+    crosses_boundary,
+    get_phrase_index,
+    phonetic_code,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_VECTORIZED_WINDOWS = 64
+MATCH_CONTEXT_TOKENS = 16
+REVISION_WORD_THRESHOLD = 0.8
+
+
+class TranscriptState:
+    """Token-level state of a merged transcript.
+
+    Only the unstable suffix (the latest partial revision) is ever compared
+    against a new segment, and only a window of stable tokens is kept before
+    it, so the cost of adding a segment doesn't grow with the length of the
+    call.
+    """
+
+    def __init__(self, threshold: float = 0.5, window: int = 16) -> None:
+        """Initialize the state."""
+        self.threshold = threshold
+        self.window = window
+        self.tokens: list[str] = []
+        self.stable = 0
+        self.pending = 0
+
+    def add(self, segment: str, final: bool = False) -> None:
+        """Fold a segment into the transcript.
+
+        A segment following a partial result, and starting like it, is a
+        revision of the same utterance and replaces the unstable suffix. Any
+        other segment is appended as is, so a finalized utterance is never
+        revised and words repeated after it are kept.
+        """
+        new_tokens = segment.split()
+        unstable = self.tokens[self.stable :]
+        if unstable and self._is_revision(unstable, new_tokens):
+            unchanged = self._common_prefix(unstable, new_tokens)
+            self.pending = min(self.pending, self.stable + unchanged)
+            self.tokens[self.stable + unchanged :] = new_tokens[unchanged:]
+        else:
+            self.stable = len(self.tokens)
+            self.tokens.extend(new_tokens)
+        if final:
+            self.stable = len(self.tokens)
+
+    def take_pending(self) -> str:
+        """Get the text added or revised since the last call."""
+        text = " ".join(self.tokens[self.pending :])
+        self.pending = len(self.tokens)
+        drop = max(0, min(self.stable, self.pending) - self.window)
+        if drop:
+            del self.tokens[:drop]
+            self.stable -= drop
+            self.pending -= drop
+        return text
+
+    def _is_revision(self, unstable: list[str], new_tokens: list[str]) -> bool:
+        """Check whether the new tokens revise the unstable suffix.
+
+        Both must start with a similar word, and their first words as a whole
+        must be similar enough.
+        """
+        size = min(len(unstable), len(new_tokens), self.window)
+        if size == 0:
+            return False
+        return (
+            jellyfish.jaro_winkler_similarity(
+                unstable[0].lower(), new_tokens[0].lower()
+            )
+            > REVISION_WORD_THRESHOLD
+            and jellyfish.jaro_winkler_similarity(
+                " ".join(unstable[:size]).lower(), " ".join(new_tokens[:size]).lower()
+            )
+            > self.threshold
+        )
+
+    @staticmethod
+    def _common_prefix(old_tokens: list[str], new_tokens: list[str]) -> int:
+        """Count the leading tokens both lists share."""
+        count = 0
+        for old, new in zip(old_tokens, new_tokens):
+            if old.lower() != new.lower():
+                break
+            count += 1
+        return count
 
 
 class TranscriptionMerger:
-    """Tool for merging partial transcriptions."""
+    """Tool for merging partial transcriptions.
+
+    Buffered segments are flushed once no new segment arrived for
+    ``flush_interval``, and at the latest ``max_latency`` after the oldest
+    buffered segment, so the last words before the caller goes quiet are not
+    held back waiting for another segment.
+    """
 
     def __init__(
         self,
         callback: Callable[[str], None],
         flush_interval: timedelta = timedelta(seconds=1),
         threshold: float = 0.5,
+        max_latency: timedelta = timedelta(seconds=3),
+        loop: asyncio.AbstractEventLoop | None = None,
     ):
         """Initialize transcription merger."""
         self.segments: list[str] = []
-        self.last_time = datetime.now(UTC)
         self.flush_interval = flush_interval
+        self.max_latency = max_latency
         self.callback = callback
         self.threshold = threshold
+        self.state = TranscriptState(threshold)
+        self.last_flush_latency: float | None = None
+        self._loop = loop
+        self._timer: asyncio.TimerHandle | None = None
+        self._first_segment_time = 0.0
+        self._last_segment_time = 0.0
 
-    def add_segment(self, segment: str) -> None:
+    def add_segment(self, segment: str, final: bool = False) -> None:
         """Add segment to the list."""
-        current_time = datetime.now(UTC)
+        current_time = time.monotonic()
+        if not self.segments:
+            self._first_segment_time = current_time
+        self._last_segment_time = current_time
         self.segments.append(segment)
+        self.state.add(segment, final)
 
-        # Flush buffer if flush_interval has passed
-        if current_time - self.last_time < self.flush_interval:
+        if current_time - self._first_segment_time >= self.max_latency.total_seconds():
+            self.flush_buffer()
             return
 
+        if self._loop is not None and self._timer is None:
+            self._timer = self._loop.call_at(
+                self._loop.time() + self._flush_delay(current_time),
+                self._on_flush_timer,
+            )
+
+    def _flush_delay(self, current_time: float) -> float:
+        """Get the seconds until the buffer is due to be flushed."""
+        return max(
+            0.0,
+            min(
+                self._last_segment_time + self.flush_interval.total_seconds(),
+                self._first_segment_time + self.max_latency.total_seconds(),
+            )
+            - current_time,
+        )
+
+    def _on_flush_timer(self) -> None:
+        """Flush the buffer if it is due, otherwise wait for the new deadline."""
+        self._timer = None
+        if not self.segments or self._loop is None:
+            return
+        delay = self._flush_delay(time.monotonic())
+        if delay > 0:
+            self._timer = self._loop.call_at(
+                self._loop.time() + delay, self._on_flush_timer
+            )
+            return
         self.flush_buffer()
 
     def flush_buffer(self) -> None:
         """Flush buffer."""
-        self.last_time = datetime.now(UTC)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
         if not self.segments:
             return
-        segments = self.segments
+        self.last_flush_latency = time.monotonic() - self._first_segment_time
+        _LOGGER.debug("Flushing transcript after %.3fs", self.last_flush_latency)
         self.segments = []
-        merged_segments = self.merge_segments(segments)
-        self.callback(merged_segments)
+        merged_segments = self.state.take_pending()
+        if merged_segments:
+            self.callback(merged_segments)
+
+    def close(self) -> None:
+        """Flush whatever is buffered and stop the flush timer."""
+        self.flush_buffer()
 
-    def merge_segments(self, segments: list[str]) -> str:
+    def merge_segments(self, segments: list[str], final: bool = False) -> str:
         """Merge a list of transcript segments."""
-        if not segments:
-            return ""
+        state = TranscriptState(self.threshold)
+        for segment in segments:
+            state.add(segment, final)
+        return " ".join(state.tokens)
 
-        merged_text = segments[0]
-        for segment in segments[1:]:
-            merged_text = self.merge_two_segments(merged_text, segment)
-        return merged_text
 
-    def merge_two_segments(self, seg1: str, seg2: str) -> str:
-        """Merge two transcript segments based on similarity."""
-        similarity = jellyfish.jaro_winkler_similarity(seg1, seg2)
-        if similarity > self.threshold:
-            overlap_index = seg2.find(seg1.split()[-1])
-            if overlap_index != -1:
-                return seg1 + seg2[overlap_index + len(seg1.split()[-1]) :]
-        return seg1 + " " + seg2
+def jaro_winkler_upper_bound(length1: int, length2: int) -> float:
+    """Get the highest Jaro-Winkler similarity two strings of these lengths can have."""
+    if not length1 or not length2:
+        return 0.0
+    jaro = (2 + min(length1, length2) / max(length1, length2)) / 3
+    if jaro <= 0.7:
+        return jaro
+    return jaro + 0.4 * (1 - jaro)
 
 
 class PhraseMatcher:
-    """Tool for matching phrases."""
+    """Tool for matching phrases.
+
+    Fuzzy literal phrases are matched over a window of as many tokens as the
+    phrase, sliding across the newly added text only. Each window is only
+    compared to the literals the trigram index returns for it. The last
+    ``MATCH_CONTEXT_TOKENS`` tokens of the previous transcripts are carried
+    over. Regex and exact phrases are matched against the new text, so anchors
+    apply to it, then against the carried tokens joined to it, for the matches
+    spanning both. In phonetic mode, each new token is encoded once and
+    windows of codes are looked up in the index.
+    """
 
-    def __init__(self, event_phrases: EventPhrasesList, threshold: float = 0.8) -> None:
-        self.event_phrases = event_phrases
+    def __init__(self, index: PhraseIndex, threshold: float = 0.8) -> None:
+        self.index = index
         self.threshold = threshold
+        self.fired = 0
+        self._carry: list[str] = []
+        self._carry_codes: list[str] = []
+
+    def mark_fired(self, event: EventPhrases) -> None:
+        """Stop matching the given event."""
+        self.fired |= 1 << self.index.index_of(event)
+
+    def match_events(self, transcript: str) -> list[EventPhrases]:
+        """Get the unfired events matching the transcript, in config order."""
+        matched, tokens, first_new = self._match_exact(transcript)
+        self._match_fuzzy(tokens, first_new, matched)
+        return self._events(matched)
+
+    def _events(self, matched: set[int]) -> list[EventPhrases]:
+        """Get the events at the matched positions, in config order."""
+        return [
+            self.index.event_phrases[event_index] for event_index in sorted(matched)
+        ]
+
+    def _match_exact(self, transcript: str) -> tuple[set[int], list[str], int]:
+        """Match everything but the fuzzy windows, and carry the last tokens over.
+
+        Returns the matched event positions, the tokens to slide the fuzzy
+        windows over and the position of the first new token.
+        """
+        matched = set(self.index.match(transcript, self.fired))
+        context = " ".join(self._carry)
+        text = f"{context} {transcript}"
+        if context:
+            matched.update(self.index.match(text, self.fired, len(context)))
+        for event_index, phrase in self.index.uncompiled:
+            if event_index in matched or self.fired >> event_index & 1:
+                continue
+            if self.are_similar(transcript, phrase) or (
+                context
+                and any(
+                    crosses_boundary(match.start(), match.end(), len(context))
+                    for match in phrase.finditer(text)
+                )
+            ):
+                matched.add(event_index)
+
+        new_tokens = transcript.lower().split()
+        tokens = self._carry + new_tokens
+        first_new = len(self._carry)
+        codes: list[str] = []
+        if self.index.phonetic_sizes:
+            codes = self._carry_codes + [
+                phonetic_code(token, self.index.phonetic) for token in new_tokens
+            ]
+            self._match_phonetic(codes, len(self._carry_codes), matched)
+
+        keep = self.index.max_literal_size - 1
+        self._carry = tokens[-max(MATCH_CONTEXT_TOKENS, keep) :]
+        if keep > 0:
+            self._carry_codes = codes[-keep:]
+        return matched, tokens, first_new
+
+    def _fuzzy_windows(
+        self, tokens: list[str], first_new: int
+    ) -> Iterator[tuple[str, int]]:
+        """Yield each window of new tokens with the token count of a literal."""
+        for size in self.index.literal_sizes:
+            for offset in range(max(0, first_new - size + 1), len(tokens) - size + 1):
+                yield " ".join(tokens[offset : offset + size]), size
+
+    def _match_fuzzy(
+        self, tokens: list[str], first_new: int, matched: set[int]
+    ) -> None:
+        """Add the events of the literals similar to a window of new tokens."""
+        for window, size in self._fuzzy_windows(tokens, first_new):
+            self._confirm_fuzzy(
+                window, self.index.fuzzy_candidates(window, size), matched
+            )
+
+    def _confirm_fuzzy(
+        self, window: str, literal_ids: list[int], matched: set[int]
+    ) -> None:
+        """Add the events of the candidate literals similar enough to the window.
+
+        An event matches as soon as any window is over the threshold; the best
+        scoring window isn't searched for, as only the event is reported.
+        """
+        for literal_id in literal_ids:
+            literal = self.index.literals[literal_id]
+            if (
+                literal.event_index in matched
+                or self.fired >> literal.event_index & 1
+                or jaro_winkler_upper_bound(len(window), len(literal.text))
+                <= self.threshold
+            ):
+                continue
+            if jellyfish.jaro_winkler_similarity(window, literal.text) > self.threshold:
+                matched.add(literal.event_index)
+
+    def _match_phonetic(
+        self, codes: list[str], first_new: int, matched: set[int]
+    ) -> None:
+        """Add the events of the literals sounding like a window of new tokens."""
+        for size in self.index.phonetic_sizes:
+            for offset in range(max(0, first_new - size + 1), len(codes) - size + 1):
+                for event_index in self.index.phonetic_matches(
+                    codes[offset : offset + size]
+                ):
+                    if not self.fired >> event_index & 1:
+                        matched.add(event_index)
 
     def phrase_match_event(self, transcript: str) -> EventPhrases | None:
         """Get the event to fire if phrase and transcript match."""
-        for event in self.event_phrases:
-            for phrase in event.phrases:
-                if self.are_similar(transcript, phrase):
-                    return event
-        return None
+        events = self.match_events(transcript)
+        if not events:
+            return None
+        return events[0]
 
     def are_similar(self, transcript: str, phrase: str | re.Pattern) -> bool:
         """Check if two strings are similar."""
@@ -87,3 +353,258 @@ class PhraseMatcher:
 
         similarity = jellyfish.jaro_winkler_similarity(transcript, phrase)
         return similarity > self.threshold
+
+
+def match_events_batch(
+    requests: list[tuple[PhraseMatcher, str]],
+) -> list[list[EventPhrases]]:
+    """Match the transcripts of many calls, scoring their fuzzy windows together.
+
+    The windows of every call sharing a phrase index are gathered and their
+    candidates found in one vectorized pass, then confirmed per pair with
+    Jaro-Winkler. Small batches use the trigram index instead, which is
+    cheaper than building the vectors.
+    """
+    matches: list[set[int]] = []
+    pending: dict[int, tuple[PhraseIndex, list[tuple[int, str, int]]]] = {}
+    for position, (matcher, transcript) in enumerate(requests):
+        matched, tokens, first_new = matcher._match_exact(transcript)
+        matches.append(matched)
+        _, windows = pending.setdefault(id(matcher.index), (matcher.index, []))
+        windows.extend(
+            (position, window, size)
+            for window, size in matcher._fuzzy_windows(tokens, first_new)
+        )
+
+    for index, windows in pending.values():
+        if len(windows) >= MIN_VECTORIZED_WINDOWS:
+            candidates = index.batch_fuzzy_candidates(
+                [(window, size) for _, window, size in windows]
+            )
+        else:
+            candidates = [
+                index.fuzzy_candidates(window, size) for _, window, size in windows
+            ]
+        for (position, window, _), literal_ids in zip(windows, candidates):
+            requests[position][0]._confirm_fuzzy(window, literal_ids, matches[position])
+
+    return [
+        matcher._events(matched) for (matcher, _), matched in zip(requests, matches)
+    ]
+
+
+def init_match_worker(
+    phrase_events: list[dict[str, Any]], phonetic: str, fuzzy: bool
+) -> None:
+    """Build the phrase index in a worker process of the match pool."""
+    get_phrase_index(phrase_events, phonetic, fuzzy)
+
+
+def match_in_worker(
+    index_key: str,
+    requests: list[tuple[int, float, list[str], list[str], str]],
+) -> list[tuple[list[int], list[str], list[str]]]:
+    """Match a batch in a worker process.
+
+    Each request carries the state of its call's matcher: fired events,
+    threshold, carried tokens and codes, and the transcript. The positions of
+    the matched events are returned with the new carried tokens and codes.
+    """
+    index = cached_phrase_index(index_key)
+    if index is None:
+        raise KeyError(index_key)
+    matchers: list[PhraseMatcher] = []
+    for fired, threshold, carry, carry_codes, _ in requests:
+        matcher = PhraseMatcher(index, threshold)
+        matcher.fired = fired
+        matcher._carry = carry
+        matcher._carry_codes = carry_codes
+        matchers.append(matcher)
+    results = match_events_batch(
+        [(matcher, request[-1]) for matcher, request in zip(matchers, requests)]
+    )
+    return [
+        (
+            [index.index_of(event) for event in events],
+            matcher._carry,
+            matcher._carry_codes,
+        )
+        for matcher, events in zip(matchers, results)
+    ]
+
+
+class MatchBatcher:
+    """Matches the transcripts flushed during a loop iteration in one batch.
+
+    When many calls flush at once, their transcripts are queued and matched
+    together with ``match_events_batch``, on the loop, in a thread of the
+    default executor or in a process pool. Only one batch runs at a time, so
+    the transcripts of a call are matched and their events fired in order.
+    Transcripts flushed while a batch runs wait for the next one, at most
+    ``queue_depth`` per call.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        executor: str = EXECUTOR_LOOP,
+        queue_depth: int = 20,
+        process_pool: ProcessPoolExecutor | None = None,
+        process_index_key: str | None = None,
+        metrics: IntegrationMetrics | None = None,
+    ) -> None:
+        """Initialize the batcher."""
+        self._loop = loop
+        self.executor = executor
+        self.queue_depth = queue_depth
+        self._process_pool = process_pool
+        self._process_index_key = process_index_key
+        self._metrics = metrics
+        self._pending: dict[
+            PhraseMatcher,
+            tuple[list[str], Callable[[str, list[EventPhrases]], None]],
+        ] = {}
+        self._handle: asyncio.Handle | None = None
+        self._task: asyncio.Task | None = None
+
+    def submit(
+        self,
+        matcher: PhraseMatcher,
+        transcript: str,
+        callback: Callable[[str, list[EventPhrases]], None],
+    ) -> None:
+        """Queue a transcript, calling back with the events it matched."""
+        pending = self._pending.get(matcher, None)
+        if pending is None:
+            self._pending[matcher] = ([transcript], callback)
+        else:
+            transcripts = pending[0]
+            transcripts.append(transcript)
+            if len(transcripts) > self.queue_depth:
+                _LOGGER.warning(
+                    "Phrase matching is falling behind, dropping transcript: %s",
+                    transcripts.pop(0),
+                )
+        self._schedule()
+
+    async def async_drain(self) -> None:
+        """Match the queued transcripts now, waiting for the running batch first."""
+        while True:
+            if self._task is not None:
+                await self._task
+            elif self._pending:
+                if self._handle is not None:
+                    self._handle.cancel()
+                self._run()
+            else:
+                return
+
+    def close(self) -> None:
+        """Stop matching and forget the queued transcripts."""
+        self._pending = {}
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _schedule(self) -> None:
+        """Run a batch on the next loop iteration, unless one is running."""
+        if self._pending and self._handle is None and self._task is None:
+            self._handle = self._loop.call_soon(self._run)
+
+    def _run(self) -> None:
+        """Match the queued transcripts."""
+        self._handle = None
+        pending, self._pending = self._pending, {}
+        batch = [
+            (matcher, " ".join(transcripts), callback)
+            for matcher, (transcripts, callback) in pending.items()
+        ]
+        if self.executor == EXECUTOR_LOOP:
+            start = time.perf_counter()
+            results = match_events_batch(
+                [(matcher, transcript) for matcher, transcript, _ in batch]
+            )
+            self._observe(start)
+            self._dispatch(batch, results)
+            return
+        self._task = self._loop.create_task(self._run_in_executor(batch))
+
+    async def _run_in_executor(
+        self,
+        batch: list[
+            tuple[PhraseMatcher, str, Callable[[str, list[EventPhrases]], None]]
+        ],
+    ) -> None:
+        """Match a batch in the executor, then fire its events on the loop."""
+        start = time.perf_counter()
+        try:
+            if self._process_pool is not None and all(
+                matcher.index.key == self._process_index_key for matcher, _, _ in batch
+            ):
+                results = await self._match_in_process(batch)
+            else:
+                results = await self._loop.run_in_executor(
+                    None,
+                    match_events_batch,
+                    [(matcher, transcript) for matcher, transcript, _ in batch],
+                )
+            self._observe(start)
+            self._dispatch(batch, results)
+        except Exception:
+            _LOGGER.exception("Error matching %d transcripts", len(batch))
+        finally:
+            self._task = None
+            self._schedule()
+
+    def _observe(self, start: float) -> None:
+        """Record how long a batch took to match."""
+        if self._metrics is not None:
+            self._metrics.match.observe(time.perf_counter() - start)
+            if self._metrics.profiler.enabled:
+                self._metrics.profiler.record("match", start)
+
+    async def _match_in_process(
+        self,
+        batch: list[
+            tuple[PhraseMatcher, str, Callable[[str, list[EventPhrases]], None]]
+        ],
+    ) -> list[list[EventPhrases]]:
+        """Match a batch in the process pool and bring the matchers up to date."""
+        results = await self._loop.run_in_executor(
+            self._process_pool,
+            match_in_worker,
+            self._process_index_key,
+            [
+                (
+                    matcher.fired,
+                    matcher.threshold,
+                    matcher._carry,
+                    matcher._carry_codes,
+                    transcript,
+                )
+                for matcher, transcript, _ in batch
+            ],
+        )
+        events: list[list[EventPhrases]] = []
+        for (matcher, _, _), (matched, carry, carry_codes) in zip(batch, results):
+            matcher._carry = carry
+            matcher._carry_codes = carry_codes
+            events.append(
+                [matcher.index.event_phrases[event_index] for event_index in matched]
+            )
+        return events
+
+    @staticmethod
+    def _dispatch(
+        batch: list[
+            tuple[PhraseMatcher, str, Callable[[str, list[EventPhrases]], None]]
+        ],
+        results: list[list[EventPhrases]],
+    ) -> None:
+        """Call back with the events each transcript matched."""
+        for (_, transcript, callback), events in zip(batch, results):
+            if events:
+                callback(transcript, events)
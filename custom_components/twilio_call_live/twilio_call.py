@@ -1,21 +1,27 @@
-from .config import EventPhrasesList
+from .config import EventPhrases
 from .const import DOMAIN
+from .dispatcher import TwilioDataDispatcher
+from .metrics import IntegrationMetrics
+from .phrase_index import PhraseIndex
+from .scheduler import TimerWheel, WheelTimer
+from .segment_queue import SegmentQueue
+from .transcript_store import TranscriptStore
 from .transcription_utils import (
+    MatchBatcher,
     PhraseMatcher,
     TranscriptionMerger,
 )
+from .twiml import message_twiml, transcription_twiml
+from .webhook import DeliveryCache, WebhookPayload
 
-from homeassistant.components.twilio import RECEIVED_DATA
-from homeassistant.core import Event, HomeAssistant
-from homeassistant.helpers.event import async_track_point_in_utc_time, _TypedDictT
-from pytz import UTC
+from homeassistant.core import HomeAssistant
 from twilio.rest import Client
 from twilio.rest.api.v2010.account.call import CallInstance
 
+import asyncio
 import logging
-import json
-from datetime import UTC, datetime, timedelta
-from inspect import isfunction
+import time
+from datetime import datetime, timedelta
 from typing import Any, Callable
 
 _LOGGER = logging.getLogger(__name__)
@@ -28,86 +34,188 @@ class TwilioCall:
         self,
         hass: HomeAssistant,
         complete_callback: Callable[["TwilioCall"], None],
-        event_phrases: list[dict[str, Any]],
+        phrase_index: PhraseIndex,
         client: Client,
+        dispatcher: TwilioDataDispatcher,
+        batcher: MatchBatcher,
+        scheduler: TimerWheel,
+        metrics: IntegrationMetrics,
         process_live: bool = False,
         hangup_after: timedelta | None = None,
+        requested_at: float | None = None,
+        transcripts: TranscriptStore | None = None,
     ) -> None:
         self.hass = hass
         self.client = client
+        self.dispatcher = dispatcher
+        self.batcher = batcher
+        self.scheduler = scheduler
+        self.transcripts = transcripts
+        self.metrics = metrics
         self.complete_callback = complete_callback
         self.call_instance: CallInstance
         self.process_live = process_live
         self.hangup_after = hangup_after
         self.transcription_resource = None
         self.transcription = None
-        self.merger = TranscriptionMerger(self._process_transcript)
-        self.matcher = PhraseMatcher(EventPhrasesList(event_phrases))
+        self.merger = TranscriptionMerger(self._process_transcript, loop=hass.loop)
+        self.matcher = PhraseMatcher(phrase_index)
+        self.segments = SegmentQueue()
+        self.deliveries = DeliveryCache()
+        self._consumer: asyncio.Task | None = None
         self.unsubscribe: dict[str, Any] = {}
+        self._hangup_timer: WheelTimer | None = None
+        self.requested_at = (
+            requested_at if requested_at is not None else time.monotonic()
+        )
+        self.first_transcript_latency: float | None = None
+        self._utterance: str | None = None
 
     async def initiate_call(
-        self, from_number: str, to_number: str, url: str, webhook_url: str | None = None
+        self,
+        from_number: str,
+        to_number: str,
+        message: str,
+        webhook_url: str | None = None,
     ) -> str | None:
-        """Initiate the call with Twilio."""
+        """Initiate the call with Twilio.
+
+        Plain-text messages are rendered to TwiML locally, URLs are fetched by
+        Twilio. When processing live, the TwiML starts the transcription before
+        the message, so transcription runs from the first second of the call
+        without a second REST request.
+        """
+        if not message.startswith(("http://", "https://")):
+            content = {"twiml": message_twiml(message, self.process_live, webhook_url)}
+        elif self.process_live:
+            content = {"twiml": transcription_twiml(message, webhook_url)}
+        else:
+            content = {"url": message}
         self.call_instance = await self.client.calls.create_async(
-            from_=from_number, to=to_number, url=url, status_callback=webhook_url
+            from_=from_number,
+            to=to_number,
+            status_callback=webhook_url,
+            **content,
         )
-        _LOGGER.info("Intiated call %s", self.call_instance.sid)
+        self.metrics.call_setup.observe(time.monotonic() - self.requested_at)
         if self.process_live:
             self.transcription = ""
-            self.unsubscribe["data"] = self.hass.bus.listen(
-                RECEIVED_DATA, self.on_twilio_data_received
-            )
-
-            await self.call_instance.transcriptions.create_async(
-                # name=
-                track="inbound",
-                status_callback_url="",
-                status_callback_method="",
-                partial_results=True,
-                language_code="en-US",
-                speech_model="telephony",
-                transcription_engine="google",
-                enable_automatic_punctuation=False,
+            self._consumer = self.hass.async_create_background_task(
+                self._consume_segments(),
+                f"twilio_call_live segments {self.call_instance.sid}",
             )
+            self.dispatcher.async_register(self.call_instance.sid, self)
+        _LOGGER.info("Intiated call %s", self.call_instance.sid)
         if self.hangup_after is not None:
-            self.unsubscribe["hangup"] = async_track_point_in_utc_time(
-                self.hass, self.hangup, datetime.now(UTC) + self.hangup_after
+            self._hangup_timer = self.scheduler.schedule(
+                self.hangup_after.total_seconds(), self._on_hangup_due
             )
         return self.call_instance.sid
 
-    async def on_twilio_data_received(self, event: Event[_TypedDictT]) -> None:
-        """Handle twilio data received event."""
+    async def on_twilio_data_received(
+        self, payload: WebhookPayload, received_at: float | None = None
+    ) -> None:
+        """Handle twilio data received for this call.
+
+        ``received_at`` is the ``time.perf_counter()`` the delivery was
+        received at, if known.
+        """
         if not self.process_live:
             return
-        if event.data.get("CallSid", None) != self.call_instance:
-            return
-        if event.data.get("CallStatus", None) == "completed":
-            self._on_call_complete()
-        transcription_data = event.data.get("TranscriptionData", None)
-        transcription_text = event.data.get("TranscriptionText", None)
-        if transcription_data is not None:
-            transcription = json.loads(transcription_data)
+        if payload.has_transcription:
+            self.segments.put_nowait(payload)
+            self.metrics.queue_depth.observe(len(self.segments))
+        if payload.transcription_text is not None:
+            self._on_transcription_text(payload.transcription_text)
+        if received_at is not None:
+            self.metrics.webhook.observe(time.perf_counter() - received_at)
+        if payload.completed:
+            await self._on_call_complete()
+
+    async def _consume_segments(self) -> None:
+        """Decode and merge the queued segments, one at a time and in order."""
+        profiler = self.metrics.profiler
+        while (payload := await self.segments.get()) is not None:
+            start = time.perf_counter() if profiler.enabled else 0.0
+            try:
+                transcription = payload.transcription
+            except ValueError:
+                _LOGGER.warning("Invalid transcription data for %s", payload.call_sid)
+                continue
+            if start:
+                profiler.record("decode", start)
             self._on_transcription_data(
                 transcription.get("transcript", None),
                 transcription.get("confidence", None),
+                payload.final,
+            )
+
+    async def _drain_segments(self) -> None:
+        """Merge the segments still queued, then stop the consumer.
+
+        An utterance still waiting for its final segment is logged as is.
+        """
+        self.segments.close()
+        if self._consumer is not None:
+            await self._consumer
+            self._consumer = None
+        if self._utterance is not None:
+            self._log_utterance(self._utterance)
+        if self.segments.coalesced:
+            _LOGGER.debug(
+                "Coalesced %d superseded partial results", self.segments.coalesced
             )
-        if transcription_text is not None:
-            self._on_transcription_text(transcription_text)
 
     async def _on_call_complete(self) -> None:
-        """Handle when the call is completed."""
-        await self.hangup()
+        """Handle when the call is completed.
+
+        Twilio already ended the call, so it isn't hung up; doing so would be
+        rejected as the call is no longer in progress.
+        """
+        if self._hangup_timer is not None:
+            self._hangup_timer.cancel()
+            self._hangup_timer = None
+        self.dispatcher.async_unregister(self.call_instance.sid)
+        await self._drain_segments()
+        self.merger.close()
         self.complete_callback(self)
 
     def _on_transcription_data(
-        self, transcript: str | None, confidence: float | None
+        self, transcript: str | None, confidence: float | None, final: bool = False
     ) -> None:
         """Handle transcription data received."""
         if transcript is None:
             return
+        if self.first_transcript_latency is None:
+            self.first_transcript_latency = time.monotonic() - self.requested_at
+            self.metrics.first_transcript.observe(self.first_transcript_latency)
+            _LOGGER.info(
+                "First transcript for call %s after %.3fs",
+                self.call_instance.sid,
+                self.first_transcript_latency,
+            )
         _LOGGER.info("_on_transcription_data: %s", transcript)
-        self.merger.add_segment(transcript)
+        start = time.perf_counter()
+        self.merger.add_segment(transcript, final)
+        self.metrics.merge.observe(time.perf_counter() - start)
+        if self.metrics.profiler.enabled:
+            self.metrics.profiler.record("merge", start)
+        if self.transcripts is None:
+            return
+        if final:
+            self._log_utterance(transcript)
+        else:
+            self._utterance = transcript
+
+    def _log_utterance(self, transcript: str) -> None:
+        """Log an utterance of the call once it is finalized.
+
+        Each final segment carries the whole utterance, as revised by the
+        partial results before it, so none of those are logged.
+        """
+        self._utterance = None
+        if self.transcripts is not None and transcript.strip():
+            self.transcripts.append(self.call_instance.sid, transcript)
 
     def _on_transcription_text(self, transcript: str) -> None:
         """Handle transcription text received."""
@@ -115,36 +223,59 @@ class TwilioCall:
 
     def _process_transcript(self, transcript: str) -> None:
         """Process transcript."""
-        event = self.matcher.phrase_match_event(transcript)
-        if event is None:
-            return
-        _LOGGER.info(
-            "._process_transcript: Found event %s, phrases: %s, transcript: %s",
-            event.event,
-            event.phrases_string,
-            transcript,
-        )
-        self.matcher.event_phrases.remove(event)
-        self.hass.bus.fire(event.event, {"transcript": transcript})
+        if self.merger.last_flush_latency is not None:
+            self.metrics.flush.observe(self.merger.last_flush_latency)
+        self.batcher.submit(self.matcher, transcript, self._on_events_matched)
+
+    def _on_events_matched(self, transcript: str, events: list[EventPhrases]) -> None:
+        """Fire every event matched by the transcript, in config order."""
+        start = time.perf_counter()
+        for event in events:
+            _LOGGER.info(
+                "._process_transcript: Found event %s, phrases: %s, transcript: %s",
+                event.event,
+                event.phrases_string,
+                transcript,
+            )
+            self.matcher.mark_fired(event)
+            self.metrics.events_fired.add()
+            self.hass.bus.fire(event.event, {"transcript": transcript})
         self.hass.bus.fire(DOMAIN, {"transcript": transcript})
+        if self.metrics.profiler.enabled:
+            self.metrics.profiler.record("fire", start)
+
+    def _on_hangup_due(self) -> None:
+        """Hang up once the call reached its duration limit."""
+        self._hangup_timer = None
+        self.hass.async_create_task(self.hangup())
 
-    async def hangup(self, time_date: datetime | None = None) -> None:
-        """Hangup the call."""
+    async def hangup(self, time_date: datetime | None = None) -> bool:
+        """Hangup the call, returning whether Twilio confirmed it ended."""
         try:
             _LOGGER.info("Hanging up call.")
-            unsub = self.unsubscribe.pop("hangup", None)
-            if unsub is not None and isfunction(unsub):
-                unsub()
+            if self._hangup_timer is not None:
+                self._hangup_timer.cancel()
+                self._hangup_timer = None
 
-            await self.call_instance.update_async(method="POST", status="completed")
+            self.call_instance = await self.call_instance.update_async(
+                method="POST", status="completed"
+            )
         except Exception as exc:
             _LOGGER.error("Error hanging up call %s", exc, exc_info=exc)
+            return False
+        return self.call_instance.status in (
+            CallInstance.Status.COMPLETED,
+            CallInstance.Status.CANCELED,
+        )
 
-    async def cancel_subscriptions(self) -> None:
-        """Unsubscribe from listeners."""
-        await self.hangup()
-        for key in ["data", "hangup", "transcript"]:
-            unsub = self.unsubscribe.get(key, None)
-            if not isfunction(unsub):
-                continue
-            unsub()
+    async def cancel_subscriptions(self) -> bool:
+        """Unsubscribe from listeners and hang up, returning whether it ended."""
+        if self._hangup_timer is not None:
+            self._hangup_timer.cancel()
+            self._hangup_timer = None
+        self.dispatcher.async_unregister(self.call_instance.sid)
+        for key in list(self.unsubscribe):
+            self.unsubscribe.pop(key)()
+        await self._drain_segments()
+        self.merger.close()
+        return await self.hangup()
@@ -0,0 +1,44 @@
+"""TwiML documents used when creating calls."""
+
+from functools import lru_cache
+
+from twilio.twiml.voice_response import Start, VoiceResponse
+
+MESSAGE_TWIML_CACHE_SIZE = 256
+
+
+def _start_transcription(
+    response: VoiceResponse, status_callback_url: str | None
+) -> None:
+    """Start live transcription of the inbound track."""
+    start = Start()
+    start.transcription(
+        track="inbound_track",
+        status_callback_url=status_callback_url,
+        partial_results=True,
+        language_code="en-US",
+        speech_model="telephony",
+        transcription_engine="google",
+        enable_automatic_punctuation=False,
+    )
+    response.append(start)
+
+
+def transcription_twiml(url: str, status_callback_url: str | None) -> str:
+    """TwiML that starts live transcription, then runs the TwiML at url."""
+    response = VoiceResponse()
+    _start_transcription(response, status_callback_url)
+    response.redirect(url)
+    return response.to_xml(xml_declaration=False)
+
+
+@lru_cache(maxsize=MESSAGE_TWIML_CACHE_SIZE)
+def message_twiml(
+    message: str, transcribe: bool = False, status_callback_url: str | None = None
+) -> str:
+    """TwiML that speaks the message, optionally starting live transcription first."""
+    response = VoiceResponse()
+    if transcribe:
+        _start_transcription(response, status_callback_url)
+    response.say(message)
+    return response.to_xml(xml_declaration=False)
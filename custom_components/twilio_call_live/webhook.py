@@ -0,0 +1,144 @@
+"""Handling of the webhook deliveries Twilio sends for a call."""
+
+from collections import OrderedDict
+import json
+import time
+from typing import Any, Callable, Hashable, Mapping
+
+try:
+    import orjson
+
+    _loads: Callable[[str], Any] = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+MAX_REMEMBERED_DELIVERIES = 256
+DELIVERY_TTL = 600.0
+TRANSCRIPTION_CONTENT = "transcription-content"
+TERMINAL_CALL_STATUSES = frozenset(
+    {"completed", "busy", "no-answer", "failed", "canceled"}
+)
+
+
+class WebhookPayload:
+    """The parts of a webhook delivery a call acts on.
+
+    ``TranscriptionData`` is kept as received and only decoded the first time
+    ``transcription`` is read, so segments that are coalesced away are never
+    decoded.
+    """
+
+    __slots__ = (
+        "call_sid",
+        "completed",
+        "final",
+        "transcription_text",
+        "_transcription_data",
+        "_transcription",
+    )
+
+    def __init__(
+        self,
+        call_sid: str,
+        completed: bool = False,
+        final: bool = False,
+        transcription_data: str | None = None,
+        transcription_text: str | None = None,
+    ) -> None:
+        """Initialize the payload."""
+        self.call_sid = call_sid
+        self.completed = completed
+        self.final = final
+        self.transcription_text = transcription_text
+        self._transcription_data = transcription_data
+        self._transcription: dict[str, Any] | None = None
+
+    @property
+    def has_transcription(self) -> bool:
+        """Check whether the delivery carries transcription data."""
+        return self._transcription_data is not None
+
+    @property
+    def transcription(self) -> dict[str, Any]:
+        """Get the decoded transcription data, raising ValueError if it is invalid."""
+        if self._transcription is None:
+            self._transcription = (
+                _loads(self._transcription_data)
+                if self._transcription_data is not None
+                else {}
+            )
+        return self._transcription
+
+
+def parse_webhook(call_sid: str, data: Mapping[str, Any]) -> WebhookPayload | None:
+    """Parse a delivery for the given call, or None if there is nothing to act on.
+
+    The event type is checked before anything else is read: transcription
+    started and stopped events, and status callbacks for a call that hasn't
+    ended, are dismissed without building a payload. A call that never
+    connected ends with a busy, no-answer, failed or canceled status instead
+    of completed, and is completed all the same.
+    """
+    event_type = data.get("TranscriptionEvent", None)
+    if event_type is not None and event_type != TRANSCRIPTION_CONTENT:
+        return None
+    completed = data.get("CallStatus", None) in TERMINAL_CALL_STATUSES
+    transcription_data = data.get("TranscriptionData", None)
+    transcription_text = data.get("TranscriptionText", None)
+    if not completed and transcription_data is None and transcription_text is None:
+        return None
+    return WebhookPayload(
+        call_sid,
+        completed,
+        data.get("Final", None) == "true",
+        transcription_data,
+        transcription_text,
+    )
+
+
+def delivery_key(data: Mapping[str, Any]) -> Hashable:
+    """Identify a webhook delivery, so a retried delivery gets the same key.
+
+    Transcription deliveries carry a ``SequenceId`` and status callbacks a
+    ``SequenceNumber``; anything else is identified by its content.
+    """
+    sequence_id = data.get("SequenceId", None)
+    if sequence_id is not None:
+        return ("transcription", sequence_id)
+    sequence_number = data.get("SequenceNumber", None)
+    if sequence_number is not None:
+        return ("status", sequence_number, data.get("CallStatus", None))
+    return hash(tuple(sorted(data.items())))
+
+
+class DeliveryCache:
+    """Bounded memory of the deliveries already received for a call.
+
+    Keys are remembered in arrival order for at most ``ttl`` seconds, and only
+    the newest ``maxsize`` are kept, so checking and recording a delivery is
+    O(1) and the memory used per call is bounded.
+    """
+
+    def __init__(
+        self, maxsize: int = MAX_REMEMBERED_DELIVERIES, ttl: float = DELIVERY_TTL
+    ) -> None:
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._seen: OrderedDict[Hashable, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of remembered deliveries."""
+        return len(self._seen)
+
+    def is_duplicate(self, key: Hashable) -> bool:
+        """Check whether the delivery was already received, remembering it if not."""
+        now = time.monotonic()
+        while self._seen and next(iter(self._seen.values())) <= now - self.ttl:
+            self._seen.popitem(last=False)
+        if key in self._seen:
+            return True
+        self._seen[key] = now
+        if len(self._seen) > self.maxsize:
+            self._seen.popitem(last=False)
+        return False
@@ -0,0 +1 @@
+"""Tests for the twilio_call_live integration."""
@@ -0,0 +1,42 @@
+"""Tests for matching the flushed transcripts of many calls in batches."""
+
+import asyncio
+
+import pytest
+
+from custom_components.twilio_call_live.config import EventPhrases
+from custom_components.twilio_call_live.const import EXECUTOR_LOOP, EXECUTOR_THREAD
+from custom_components.twilio_call_live.phrase_index import get_phrase_index
+from custom_components.twilio_call_live.transcription_utils import (
+    MatchBatcher,
+    PhraseMatcher,
+)
+
+
+@pytest.mark.parametrize("executor", [EXECUTOR_LOOP, EXECUTOR_THREAD])
+def test_drain_matches_queued_transcripts(executor: str) -> None:
+    """Draining matches the running batch and the transcripts queued behind it."""
+    index = get_phrase_index(
+        [
+            {"event": "fire", "phrases": [r"fire\b"]},
+            {"event": "smoke", "phrases": [r"smoke\b"]},
+        ]
+    )
+    matched: list[str] = []
+
+    def on_matched(transcript: str, events: list[EventPhrases]) -> None:
+        matched.extend(event.event for event in events)
+
+    async def run() -> None:
+        batcher = MatchBatcher(asyncio.get_running_loop(), executor)
+        first, second = PhraseMatcher(index), PhraseMatcher(index)
+        batcher.submit(first, "there is fire", on_matched)
+        await asyncio.sleep(0)
+        batcher.submit(first, "and smoke", on_matched)
+        batcher.submit(second, "smoke here", on_matched)
+        await batcher.async_drain()
+        batcher.close()
+
+    asyncio.run(run())
+
+    assert sorted(matched) == ["fire", "smoke", "smoke"]
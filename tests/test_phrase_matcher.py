@@ -0,0 +1,135 @@
+"""Tests for matching phrases against flushed transcripts."""
+
+import pytest
+
+from custom_components.twilio_call_live.phrase_index import get_phrase_index
+from custom_components.twilio_call_live.transcription_utils import (
+    PhraseMatcher,
+    TranscriptionMerger,
+)
+
+
+def _flushed(segments: list[str]) -> list[str]:
+    """Flush the merger after each segment, like partials a second apart."""
+    flushed: list[str] = []
+    merger = TranscriptionMerger(flushed.append)
+    for segment in segments:
+        merger.add_segment(segment)
+        merger.flush_buffer()
+    return flushed
+
+
+def _fired(matcher: PhraseMatcher, transcripts: list[str]) -> list[str]:
+    """Match each transcript in turn, firing the matched events."""
+    fired: list[str] = []
+    for transcript in transcripts:
+        for event in matcher.match_events(transcript):
+            matcher.mark_fired(event)
+            fired.append(event.event)
+    return fired
+
+
+def test_regex_spanning_flushes() -> None:
+    """A regex phrase split between two flushes matches."""
+    index = get_phrase_index([{"event": "gas", "phrases": [r"gas\s+leak"]}])
+    transcripts = _flushed(["there is a gas", "there is a gas leak in the basement"])
+
+    assert transcripts == ["there is a gas", "leak in the basement"]
+    assert _fired(PhraseMatcher(index), transcripts) == ["gas"]
+
+
+def test_carried_text_not_matched_again() -> None:
+    """A phrase in the carried tokens only matches with the flush it came in."""
+    index = get_phrase_index([{"event": "fire", "phrases": [r"fire\b"]}])
+    matcher = PhraseMatcher(index)
+
+    assert [event.event for event in matcher.match_events("fire here")] == ["fire"]
+    assert matcher.match_events("and more") == []
+
+
+def test_every_matched_event_returned() -> None:
+    """Every event a transcript matches is returned, in config order."""
+    index = get_phrase_index(
+        [
+            {"event": "fire", "phrases": [r"fire\b"]},
+            {"event": "smoke", "phrases": [r"smoke\b"]},
+        ]
+    )
+    transcripts = _flushed(["there is fire and smoke in the kitchen"])
+
+    assert _fired(PhraseMatcher(index), transcripts) == ["fire", "smoke"]
+
+
+@pytest.mark.parametrize(
+    ("phrase", "transcript"),
+    [
+        ("help", "hello there"),
+        ("yes", "yet another"),
+        ("call me", "tall meat"),
+    ],
+)
+def test_literal_not_matched_fuzzily_by_default(phrase: str, transcript: str) -> None:
+    """A literal phrase only matches itself unless fuzzy matching is on."""
+    index = get_phrase_index([{"event": "event", "phrases": [phrase]}])
+
+    assert PhraseMatcher(index).match_events(transcript) == []
+
+
+@pytest.mark.parametrize(
+    ("phrase", "transcript"),
+    [
+        ("help", "please HELP me"),
+        ("yes", "Yes I do"),
+        ("call me", "can you call me back"),
+    ],
+)
+def test_literal_matched_exactly(phrase: str, transcript: str) -> None:
+    """A literal phrase matches case-insensitively."""
+    index = get_phrase_index([{"event": "event", "phrases": [phrase]}])
+
+    assert [event.event for event in PhraseMatcher(index).match_events(transcript)] == [
+        "event"
+    ]
+
+
+def test_literal_matched_fuzzily_when_enabled() -> None:
+    """With fuzzy matching on, a literal phrase also matches similar words."""
+    index = get_phrase_index([{"event": "event", "phrases": ["call me"]}], fuzzy=True)
+
+    assert [
+        event.event for event in PhraseMatcher(index).match_events("tall meat")
+    ] == ["event"]
+
+
+def test_overlapping_regex_events() -> None:
+    """Regex events matching at the same position all fire."""
+    index = get_phrase_index(
+        [
+            {"event": "a", "phrases": [r"gas (leak|smell)"]},
+            {"event": "b", "phrases": [r"gas leaks?"]},
+        ]
+    )
+
+    assert _fired(PhraseMatcher(index), ["there is a gas leak here"]) == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    ("phrase", "transcripts"),
+    [
+        (r"^yes", ["no", "yes please"]),
+        (r"^yes$", ["hello", "yes"]),
+        (r"(\w+) \1", ["well", "yes yes"]),
+    ],
+)
+def test_anchors_apply_to_each_flush(phrase: str, transcripts: list[str]) -> None:
+    """Anchored phrases match at the start of a later flush."""
+    index = get_phrase_index([{"event": "event", "phrases": [phrase]}])
+
+    assert _fired(PhraseMatcher(index), transcripts) == ["event"]
+
+
+def test_anchors_not_matched_across_flushes() -> None:
+    """An anchored phrase doesn't match the start of the carried text."""
+    index = get_phrase_index([{"event": "event", "phrases": [r"^no thanks"]}])
+
+    assert _fired(PhraseMatcher(index), ["well no", "thanks"]) == []
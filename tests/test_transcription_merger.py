@@ -0,0 +1,53 @@
+"""Tests for merging transcript segments."""
+
+import pytest
+
+from custom_components.twilio_call_live.transcription_utils import (
+    TranscriptionMerger,
+)
+
+
+@pytest.mark.parametrize(
+    ("segments", "merged"),
+    [
+        (
+            ["there is a", "their is a gas", "there is a gas leak"],
+            "there is a gas leak",
+        ),
+        (["yes", "yes", "yes"], "yes"),
+        (["hello there", "general kenobi"], "hello there general kenobi"),
+    ],
+)
+def test_partial_revisions(segments: list[str], merged: str) -> None:
+    """A partial result is only replaced by a segment revising it."""
+    assert (
+        TranscriptionMerger(lambda transcript: None).merge_segments(segments) == merged
+    )
+
+
+@pytest.mark.parametrize(
+    ("segments", "merged"),
+    [
+        (["call me", "me too"], "call me me too"),
+        (["yes", "yes", "yes"], "yes yes yes"),
+    ],
+)
+def test_final_utterances_kept(segments: list[str], merged: str) -> None:
+    """Finalized utterances are never revised nor deduplicated."""
+    assert (
+        TranscriptionMerger(lambda transcript: None).merge_segments(segments, True)
+        == merged
+    )
+
+
+def test_flush_after_final() -> None:
+    """The words after a finalized utterance are flushed in full."""
+    flushed: list[str] = []
+    merger = TranscriptionMerger(flushed.append)
+    merger.add_segment("call me", True)
+    merger.flush_buffer()
+    merger.add_segment("me", False)
+    merger.add_segment("me too", True)
+    merger.flush_buffer()
+
+    assert flushed == ["call me", "me too"]
@@ -0,0 +1,40 @@
+"""Tests for parsing the webhook deliveries of a call."""
+
+import pytest
+
+from custom_components.twilio_call_live.webhook import parse_webhook
+
+
+@pytest.mark.parametrize(
+    "status", ["completed", "busy", "no-answer", "failed", "canceled"]
+)
+def test_terminal_status_completes(status: str) -> None:
+    """Every status a call can end with completes it."""
+    payload = parse_webhook("CA1", {"CallSid": "CA1", "CallStatus": status})
+
+    assert payload is not None
+    assert payload.completed
+
+
+@pytest.mark.parametrize("status", ["queued", "ringing", "in-progress"])
+def test_ongoing_status_dismissed(status: str) -> None:
+    """A status callback for a call that hasn't ended is dismissed."""
+    assert parse_webhook("CA1", {"CallSid": "CA1", "CallStatus": status}) is None
+
+
+def test_transcription_event_not_completed() -> None:
+    """A transcription delivery doesn't complete the call."""
+    payload = parse_webhook(
+        "CA1",
+        {
+            "CallSid": "CA1",
+            "TranscriptionEvent": "transcription-content",
+            "TranscriptionData": '{"transcript": "hello"}',
+            "Final": "true",
+        },
+    )
+
+    assert payload is not None
+    assert not payload.completed
+    assert payload.final
+    assert payload.transcription == {"transcript": "hello"}